@@ -206,11 +206,10 @@ class DumbModel(BaseModel):
         self.material = material
         self.texture = texture
 
-        vertices = solid.get_cover_triangles()
-        normales = solid.get_normales_repeated()
+        buffers = solid.export_buffers(["position", "normal"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.nbo = self.ctx.buffer(normales.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
+        self.nbo = self.ctx.buffer(buffers["normal"])
 
         vao_args = [
             (self.vbo, '3f', 'aVertexPosition'),
@@ -218,10 +217,9 @@ class DumbModel(BaseModel):
         ]
 
         if texmap is not None:
-            tex_indexes = solid.get_cover_triangles_tex()
-            tex_coords = [(texmap[2 * i], texmap[2 * i + 1]) for i in tex_indexes]
-            tex = np.array(tex_coords, dtype="f4").flatten()
-            self.tbo = self.ctx.buffer(tex.astype('f4').tobytes())
+            tex_indexes = solid.export_buffers(["texindex"])["texindex"]
+            tex = np.asarray(texmap, dtype='f4').reshape((-1, 2))[tex_indexes]
+            self.tbo = self.ctx.buffer(tex)
             vao_args.append((self.tbo, '2f', 'in_texcoord_0'))
 
         self.vao = self.ctx.vertex_array(self.prog, vao_args)
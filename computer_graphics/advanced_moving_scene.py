@@ -203,11 +203,10 @@ class MovingModel:
         full_angle = math.pi - math.acos(-1 / math.sqrt(5))
         self.move = (quad * (full_angle / np.sum(quad))).tolist()
 
-        vertices = solid.get_cover_triangles()
-        normales = solid.get_normales_repeated()
+        buffers = solid.export_buffers(["position", "normal"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes(), dynamic=True)
-        self.nbo = self.ctx.buffer(normales.astype('f4').tobytes(), dynamic=True)
+        self.vbo = self.ctx.buffer(buffers["position"], dynamic=True)
+        self.nbo = self.ctx.buffer(buffers["normal"], dynamic=True)
 
         vao_args = [
             (self.vbo, '3f', 'aVertexPosition'),
@@ -215,17 +214,16 @@ class MovingModel:
         ]
 
         if texmap is not None:
-            tex_indexes = solid.get_cover_triangles_tex()
-            tex_coords = [(texmap[2 * i], texmap[2 * i + 1]) for i in tex_indexes]
-            tex = np.array(tex_coords, dtype="f4").flatten()
-            self.tbo = self.ctx.buffer(tex.astype('f4').tobytes())
+            tex_indexes = solid.export_buffers(["texindex"])["texindex"]
+            tex = np.asarray(texmap, dtype='f4').reshape((-1, 2))[tex_indexes]
+            self.tbo = self.ctx.buffer(tex)
             vao_args.append((self.tbo, '2f', 'in_texcoord_0'))
 
         self.vao = self.ctx.vertex_array(self.prog, vao_args)
 
     def roll(self, lface: int, rface: int, angle: float) -> None:
         lv_idx, rv_idx = self.solid.get_common_edge(lface, rface)
-        pos = self.solid.graph.vs[lv_idx]["coord"]
+        pos = self.solid.coords[lv_idx]
         if self.rnormal is None:
             self.rnormal = self.solid.get_face_normal(rface)
             self.rnormal[1] = 0.0
@@ -237,17 +235,14 @@ class MovingModel:
         rot = pyrr.Matrix44.from_y_rotation(ang, dtype='f4')
         backrot = pyrr.Matrix44.from_y_rotation(-ang, dtype='f4')
 
-        self.solid.transform(backrot * backtrans)
-        self.solid.transform(pyrr.Matrix44.from_x_rotation(angle, dtype='f4'))
-        self.solid.transform(trans * rot)
+        xrot = pyrr.Matrix44.from_x_rotation(angle, dtype='f4')
+        self.solid.transform(trans * rot * xrot * backrot * backtrans)
         return
 
     def render(self) -> None:
         self.write_material()
         if self.texture is not None:
             self.texture.use()
-        self.vbo.clear()
-        self.nbo.clear()
         full_angle = math.pi - math.acos(-1 / math.sqrt(5))
         if np.allclose(self.roll_angle, full_angle, rtol=1e-2) or (self.roll_angle >= full_angle):
             self.roll_idx += 1
@@ -258,8 +253,9 @@ class MovingModel:
         self.roll_angle += step
         self.move.append(step)
 
-        self.vbo.write(self.solid.get_cover_triangles().astype('f4').tobytes(), offset=0)
-        self.nbo.write(self.solid.get_normales_repeated().astype('f4').tobytes(), offset=0)
+        buffers = self.solid.export_buffers(["position", "normal"])
+        self.vbo.write(buffers["position"], offset=0)
+        self.nbo.write(buffers["normal"], offset=0)
 
         self.vao.render(mode=mgl.TRIANGLES)
 
@@ -297,11 +293,10 @@ class DumbModel(BaseModel):
         self.material = material
         self.texture = texture
 
-        vertices = solid.get_cover_triangles()
-        normales = solid.get_normales_repeated()
+        buffers = solid.export_buffers(["position", "normal"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.nbo = self.ctx.buffer(normales.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
+        self.nbo = self.ctx.buffer(buffers["normal"])
 
         vao_args = [
             (self.vbo, '3f', 'aVertexPosition'),
@@ -309,10 +304,9 @@ class DumbModel(BaseModel):
         ]
 
         if texmap is not None:
-            tex_indexes = solid.get_cover_triangles_tex()
-            tex_coords = [(texmap[2 * i], texmap[2 * i + 1]) for i in tex_indexes]
-            tex = np.array(tex_coords, dtype="f4").flatten()
-            self.tbo = self.ctx.buffer(tex.astype('f4').tobytes())
+            tex_indexes = solid.export_buffers(["texindex"])["texindex"]
+            tex = np.asarray(texmap, dtype='f4').reshape((-1, 2))[tex_indexes]
+            self.tbo = self.ctx.buffer(tex)
             vao_args.append((self.tbo, '2f', 'in_texcoord_0'))
 
         self.vao = self.ctx.vertex_array(self.prog, vao_args)
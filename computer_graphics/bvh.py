@@ -0,0 +1,243 @@
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+
+def morton_codes(points: np.ndarray) -> NDArray[np.uint64]:
+    # 10 bits per axis, interleaved x, y, z
+    lo = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lo, 1e-30)
+    cells = np.clip((points - lo) / extent * 1023.0, 0, 1023).astype(np.uint64)
+    codes = np.zeros(points.shape[0], dtype=np.uint64)
+    for axis in range(3):
+        x = cells[:, axis]
+        x = (x | (x << np.uint64(16))) & np.uint64(0x030000FF)
+        x = (x | (x << np.uint64(8))) & np.uint64(0x0300F00F)
+        x = (x | (x << np.uint64(4))) & np.uint64(0x030C30C3)
+        x = (x | (x << np.uint64(2))) & np.uint64(0x09249249)
+        codes |= x << np.uint64(2 - axis)
+    return codes
+
+def closest_points_on_triangles(p: np.ndarray, a: np.ndarray, b: np.ndarray,
+                                c: np.ndarray) -> NDArray[np.float64]:
+    # Voronoi region test per (point, triangle) row, Ericson's "Real-Time Collision Detection" 5.1.5
+    def dot(x, y):
+        return np.einsum('ij,ij->i', x, y)
+
+    ab, ac = b - a, c - a
+    ap, bp, cp = p - a, p - b, p - c
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = va + vb + vc
+        result = a + ab * (vb / denom)[:, None] + ac * (vc / denom)[:, None]
+        # Later regions take precedence, as the early returns of the scalar version do
+        bc_w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        regions = [
+            ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), b + (c - b) * bc_w[:, None]),
+            ((vb <= 0) & (d2 >= 0) & (d6 <= 0), a + ac * (d2 / (d2 - d6))[:, None]),
+            ((d6 >= 0) & (d5 <= d6), c),
+            ((vc <= 0) & (d1 >= 0) & (d3 <= 0), a + ab * (d1 / (d1 - d3))[:, None]),
+            ((d3 >= 0) & (d4 <= d3), b),
+            ((d1 <= 0) & (d2 <= 0), a),
+        ]
+    for mask, value in regions:
+        result = np.where(mask[:, None], value, result)
+    # Degenerate triangles fall through every region
+    return np.where(np.isfinite(result), result, a)
+
+
+class BVH:
+    # Linear BVH over a triangle soup. Triangles are sorted along a Morton curve and
+    # grouped into leaves of leaf_size, then a complete binary tree in heap layout is
+    # put over the leaves (children of node i are 2i + 1 and 2i + 2). The split is the
+    # object median along the curve, so the tree shape depends only on the triangle
+    # order and refit() only has to recompute boxes.
+    def __init__(self, coords: np.ndarray, triangles: np.ndarray, leaf_size: int = 4) -> None:
+        self.triangles: NDArray[np.int32] = np.ascontiguousarray(triangles, dtype=np.int32).reshape((-1, 3))
+        self.triangle_num = self.triangles.shape[0]
+        self.leaf_size = leaf_size
+        leaf_num = max(-(-self.triangle_num // leaf_size), 1)
+        self.leaf_num = 1 << (leaf_num - 1).bit_length()
+        self.depth = self.leaf_num.bit_length() - 1
+        self.node_num = 2 * self.leaf_num - 1
+
+        coords = np.asarray(coords, dtype=np.float64)
+        order = np.argsort(morton_codes(coords[self.triangles].mean(axis=1)), kind='stable')
+        # Triangle of every leaf slot, -1 for padding at the end
+        self.slots = np.full(self.leaf_num * leaf_size, -1, dtype=np.int32)
+        self.slots[:self.triangle_num] = order
+
+        # First slot covered by every node; nodes starting past the last triangle are empty
+        level = np.floor(np.log2(np.arange(self.node_num) + 1)).astype(np.int64)
+        span = (self.leaf_num >> level) * leaf_size
+        self.node_first = (np.arange(self.node_num) - ((1 << level) - 1)) * span
+        self.node_valid = self.node_first < self.triangle_num
+
+        self.lo = np.empty((self.node_num, 3), dtype=np.float64)
+        self.hi = np.empty((self.node_num, 3), dtype=np.float64)
+        self.refit(coords)
+
+    def refit(self, coords: np.ndarray) -> None:
+        # Same tree, new vertex positions: leaf boxes from the triangles, then one
+        # vectorized min/max per level up to the root
+        self.coords = np.asarray(coords, dtype=np.float64)
+        corners = np.full((self.slots.shape[0], 3, 3), np.nan)
+        corners[:self.triangle_num] = self.coords[self.triangles[self.slots[:self.triangle_num]]]
+        corners = corners.reshape((self.leaf_num, -1, 3))
+        first_leaf = self.leaf_num - 1
+        self.lo[first_leaf:] = np.fmin.reduce(corners, axis=1, initial=np.inf)
+        self.hi[first_leaf:] = np.fmax.reduce(corners, axis=1, initial=-np.inf)
+        for k in range(self.depth - 1, -1, -1):
+            nodes = np.arange((1 << k) - 1, (1 << (k + 1)) - 1)
+            self.lo[nodes] = np.minimum(self.lo[2 * nodes + 1], self.lo[2 * nodes + 2])
+            self.hi[nodes] = np.maximum(self.hi[2 * nodes + 1], self.hi[2 * nodes + 2])
+        # Slack for flat boxes of axis aligned faces
+        pad = 1e-9 * max(float(np.max(np.abs(self.coords), initial=0.0)), 1.0)
+        self.lo -= pad
+        self.hi += pad
+
+    def leaf_candidates(self, queries: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (query, leaf node) pairs -> (query, triangle) pairs
+        slots = self.node_first[nodes][:, None] + np.arange(self.leaf_size)
+        triangles = self.slots[slots].reshape(-1)
+        queries = np.repeat(queries, self.leaf_size)
+        keep = triangles >= 0
+        return queries[keep], triangles[keep]
+
+    def ray_hits(self, origins: np.ndarray, directions: np.ndarray,
+                 t_max: float | np.ndarray = np.inf) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Every (ray, triangle, t) with 0 <= t <= t_max
+        origins = np.asarray(origins, dtype=np.float64).reshape((-1, 3))
+        directions = np.asarray(directions, dtype=np.float64).reshape((-1, 3))
+        t_max = np.broadcast_to(np.asarray(t_max, dtype=np.float64), (origins.shape[0],))
+        tiny = np.where(directions < 0, -1e-300, 1e-300)
+        inverse = 1.0 / np.where(directions == 0, tiny, directions)
+
+        rays = np.arange(origins.shape[0])
+        nodes = np.zeros_like(rays)
+        for k in range(self.depth + 1):
+            with np.errstate(over='ignore', invalid='ignore'):
+                t1 = (self.lo[nodes] - origins[rays]) * inverse[rays]
+                t2 = (self.hi[nodes] - origins[rays]) * inverse[rays]
+            near = np.minimum(t1, t2).max(axis=1)
+            far = np.maximum(t1, t2).min(axis=1)
+            hit = self.node_valid[nodes] & (near <= far) & (far >= 0) & (near <= t_max[rays])
+            rays, nodes = rays[hit], nodes[hit]
+            if k < self.depth:
+                rays = np.repeat(rays, 2)
+                nodes = np.repeat(2 * nodes + 1, 2) + np.tile([0, 1], nodes.shape[0])
+
+        # Moller-Trumbore, both sides
+        rays, triangles = self.leaf_candidates(rays, nodes)
+        corners = self.coords[self.triangles[triangles]]
+        e1 = corners[:, 1] - corners[:, 0]
+        e2 = corners[:, 2] - corners[:, 0]
+        d = directions[rays]
+        p = np.cross(d, e2)
+        det = np.einsum('ij,ij->i', e1, p)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_det = 1.0 / det
+            s = origins[rays] - corners[:, 0]
+            u = np.einsum('ij,ij->i', s, p) * inv_det
+            q = np.cross(s, e1)
+            v = np.einsum('ij,ij->i', d, q) * inv_det
+            t = np.einsum('ij,ij->i', e2, q) * inv_det
+            hit = (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= t_max[rays])
+        return rays[hit], triangles[hit], t[hit]
+
+    def ray_cast(self, origins: np.ndarray, directions: np.ndarray,
+                 t_max: float | np.ndarray = np.inf) -> Tuple[NDArray[np.float64], NDArray[np.int32]]:
+        # Nearest hit per ray: (R,) t, inf on a miss, and (R,) triangle, -1 on a miss
+        ray_num = np.asarray(origins).reshape((-1, 3)).shape[0]
+        rays, triangles, t = self.ray_hits(origins, directions, t_max)
+        order = np.lexsort((t, rays))
+        rays, triangles, t = rays[order], triangles[order], t[order]
+        first = BVH.first_of_runs(rays)
+        nearest = np.full(ray_num, np.inf)
+        nearest_triangle = np.full(ray_num, -1, dtype=np.int32)
+        nearest[rays[first]] = t[first]
+        nearest_triangle[rays[first]] = triangles[first]
+        return nearest, nearest_triangle
+
+    def count_intersections(self, origins: np.ndarray, directions: np.ndarray,
+                            t_max: float | np.ndarray = np.inf) -> NDArray[np.int64]:
+        ray_num = np.asarray(origins).reshape((-1, 3)).shape[0]
+        rays, _, _ = self.ray_hits(origins, directions, t_max)
+        return np.bincount(rays, minlength=ray_num)
+
+    def intersect_segments(self, starts: np.ndarray,
+                           ends: np.ndarray) -> Tuple[NDArray[np.float64], NDArray[np.int32]]:
+        # t is the fraction of the segment before the first hit, inf when it is clear
+        starts = np.asarray(starts, dtype=np.float64).reshape((-1, 3))
+        ends = np.asarray(ends, dtype=np.float64).reshape((-1, 3))
+        return self.ray_cast(starts, ends - starts, 1.0)
+
+    def closest_points(self, points: np.ndarray, max_distance: float = np.inf
+                       ) -> Tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.int32]]:
+        # Distance, closest surface point and its triangle for every point. Points
+        # farther than max_distance get inf, nan and -1.
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        point_num = points.shape[0]
+        # Squared distance no result can exceed: starts at max_distance, then shrinks to
+        # the distance of the first vertex under every visited node
+        bound = np.full(point_num, max_distance ** 2)
+        queries = np.arange(point_num)
+        nodes = np.zeros_like(queries)
+        for k in range(self.depth + 1):
+            p = points[queries]
+            gap = np.maximum(np.maximum(self.lo[nodes] - p, p - self.hi[nodes]), 0.0)
+            box_distance = np.einsum('ij,ij->i', gap, gap)
+            valid = self.node_valid[nodes]
+            witness = self.coords[self.triangles[self.slots[self.node_first[nodes[valid]]], 0]]
+            offset = witness - p[valid]
+            np.minimum.at(bound, queries[valid], np.einsum('ij,ij->i', offset, offset))
+            keep = valid & (box_distance <= bound[queries])
+            queries, nodes, box_distance = queries[keep], nodes[keep], box_distance[keep]
+            if k < self.depth:
+                queries = np.repeat(queries, 2)
+                nodes = np.repeat(2 * nodes + 1, 2) + np.tile([0, 1], nodes.shape[0])
+
+        # The witness bound is only as tight as a leaf is wide. Solving the nearest leaf
+        # of every point exactly first leaves far fewer leaves for the full pass.
+        order = np.lexsort((box_distance, queries))
+        nearest = order[BVH.first_of_runs(queries[order])]
+        solved, distance, _, _ = self.solve_leaves(points, queries[nearest], nodes[nearest])
+        np.minimum.at(bound, solved, distance)
+        keep = box_distance <= bound[queries]
+        queries, distance, closest, triangles = self.solve_leaves(points, queries[keep], nodes[keep])
+
+        first = BVH.first_of_runs(queries)
+        first = first[distance[first] <= max_distance ** 2]
+
+        result_distance = np.full(point_num, np.inf)
+        result_points = np.full((point_num, 3), np.nan)
+        result_triangles = np.full(point_num, -1, dtype=np.int32)
+        result_distance[queries[first]] = np.sqrt(distance[first])
+        result_points[queries[first]] = closest[first]
+        result_triangles[queries[first]] = triangles[first]
+        return result_distance, result_points, result_triangles
+
+    def solve_leaves(self, points: np.ndarray, queries: np.ndarray,
+                     nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Exact closest points for (query, leaf node) pairs, sorted by query, then squared distance
+        queries, triangles = self.leaf_candidates(queries, nodes)
+        corners = self.coords[self.triangles[triangles]]
+        closest = closest_points_on_triangles(points[queries], corners[:, 0], corners[:, 1],
+                                              corners[:, 2])
+        offset = closest - points[queries]
+        distance = np.einsum('ij,ij->i', offset, offset)
+        order = np.lexsort((distance, queries))
+        return queries[order], distance[order], closest[order], triangles[order]
+
+    @classmethod
+    def first_of_runs(cls, values: np.ndarray) -> NDArray[np.intp]:
+        # Start of every run of equal values in a sorted array
+        if values.shape[0] == 0:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
@@ -89,20 +89,19 @@ class DumbModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_vertices()
-        indexes = solid.get_cover_triangles_idx()
+        buffers = solid.export_buffers(["vertex", "index"])
         f = lambda x: (0.1, 0.1, 0.1, 0.5) if x % 2 == 0 else (0.75, 0.09, 0.03, 0.5)
-        colors = np.array([f(i) for i in range(indexes.shape[0])])
+        colors = np.array([f(i) for i in range(buffers["index"].shape[0])], dtype='f4')
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.cbo = self.ctx.buffer(colors.astype('f4').tobytes())
-        self.ibo = self.ctx.buffer(indexes.astype('u2').tobytes())
+        self.vbo = self.ctx.buffer(buffers["vertex"])
+        self.cbo = self.ctx.buffer(colors)
+        self.ibo = self.ctx.buffer(buffers["index"])
         self.vao = self.ctx.vertex_array(self.prog, [
                 (self.vbo, '3f', 'aVertexPosition'),
                 (self.cbo, '4f', 'aVertexColor'),
             ],
             index_buffer=self.ibo,
-            index_element_size=2,
+            index_element_size=4,
         )
 
     def render(self, model: pyrr.Matrix44) -> None:
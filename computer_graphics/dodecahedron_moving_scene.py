@@ -82,13 +82,13 @@ class MovingModel:
         self.roll_idx = 0
         self.roll_angle = 0
 
-        vertices = solid.get_cover_triangles()
+        vertices = solid.export_buffers(["position"])["position"]
         f = lambda x: (0.1, 0.1, 0.1, 0.5) if x % 2 == 0 else (0.75, 0.09, 0.03, 0.5)
-        colors = np.array([f(i) for i in range(vertices.shape[0])])
+        colors = np.array([f(i) for i in range(vertices.shape[0])], dtype='f4')
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes(), dynamic=True)
+        self.vbo = self.ctx.buffer(vertices, dynamic=True)
 
-        self.cbo = self.ctx.buffer(colors.astype('f4').tobytes())
+        self.cbo = self.ctx.buffer(colors)
         
         self.vao = self.ctx.vertex_array(self.prog, [
             (self.vbo, '3f', 'aVertexPosition'),
@@ -98,7 +98,7 @@ class MovingModel:
 
     def roll(self, lface: int, rface: int, angle: float) -> None:
         lv_idx, rv_idx = self.solid.get_common_edge(lface, rface)
-        pos = self.solid.graph.vs[lv_idx]["coord"]
+        pos = self.solid.coords[lv_idx]
         rnormal = self.solid.get_face_normal(rface)
         rnormal[1] = 0.0
         k = np.array([0.0, 0.0, -1.0], dtype='f4')
@@ -109,20 +109,18 @@ class MovingModel:
         rot = pyrr.Matrix44.from_y_rotation(ang, dtype='f4')
         backrot = pyrr.Matrix44.from_y_rotation(-ang, dtype='f4')
 
-        self.solid.transform(backrot * backtrans)
-        self.solid.transform(pyrr.Matrix44.from_x_rotation(angle, dtype='f4'))
-        self.solid.transform(trans * rot)
+        xrot = pyrr.Matrix44.from_x_rotation(angle, dtype='f4')
+        self.solid.transform(trans * rot * xrot * backrot * backtrans)
         return
 
     def render(self) -> None:
-        self.vbo.clear()
         if self.roll_angle >= (math.acos(-1 / math.sqrt(5)) - math.pi / 3):
             self.roll_idx += 1
             self.roll_angle = 0
         self.roll(self.rolls[self.roll_idx], self.rolls[self.roll_idx + 1], math.pi / 30)
         self.roll_angle += math.pi / 30
 
-        self.vbo.write(self.solid.get_cover_triangles().astype('f4').tobytes(), offset=0)
+        self.vbo.write(self.solid.export_buffers(["position"])["position"], offset=0)
         self.vao.render(mode=mgl.TRIANGLES)
         
 
@@ -0,0 +1,76 @@
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .solid import Solid
+
+
+class EmitterTable:
+    # Sampling table of an emitter Solid, built once per geometry: every triangle
+    # with the centroid and outward unit normal of its face, and the running
+    # triangle area, so faces are picked in proportion to their area.
+    def __init__(self, solid: Solid) -> None:
+        topology = solid.topology
+        self.generation = (solid.topology_generation, solid.geometry_generation)
+        self.corners = solid.coords[topology.triangles].astype(np.float64)
+        areas = np.linalg.norm(np.cross(self.corners[:, 1] - self.corners[:, 0],
+                                        self.corners[:, 2] - self.corners[:, 0]), axis=1) / 2
+        self.cdf = np.cumsum(areas)
+        if self.cdf.shape[0] == 0 or self.cdf[-1] <= 0:
+            raise RuntimeError("Emitter has no surface to emit from")
+        faces = topology.triangle_faces
+        self.centroids = solid.get_face_centroids()[faces]
+        normals = solid.get_face_normals()[faces].astype(np.float64)
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        self.normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    def is_current(self, solid: Solid) -> bool:
+        return self.generation == (solid.topology_generation, solid.geometry_generation)
+
+    def sample(self, count: int, rng: np.random.Generator,
+               scatter: bool = False) -> Tuple[NDArray[np.float32], NDArray[np.float32]]:
+        # (positions, unit normals) of count spawns: face centroids, or uniform
+        # points over the surface with scatter
+        picks = np.searchsorted(self.cdf, rng.uniform(0.0, self.cdf[-1], count), side='right')
+        picks = np.minimum(picks, self.cdf.shape[0] - 1)
+        if scatter:
+            u, v = rng.uniform(size=(2, count))
+            # Folding the unit square onto the triangle keeps the density uniform
+            fold = u + v > 1
+            u[fold], v[fold] = 1 - u[fold], 1 - v[fold]
+            a, b, c = self.corners[picks, 0], self.corners[picks, 1], self.corners[picks, 2]
+            positions = a + u[:, None] * (b - a) + v[:, None] * (c - a)
+        else:
+            positions = self.centroids[picks]
+        return positions.astype(np.float32), self.normals[picks].astype(np.float32)
+
+
+class Emitter:
+    # Spawns particles off a Solid with speed along the face normal, either in
+    # bursts or continuously at rate particles per tick
+    def __init__(self, solid: Solid, speed: float, rate: float = 0.0, scatter: bool = False,
+                 rng: np.random.Generator | None = None) -> None:
+        self.solid = solid
+        self.speed = speed
+        self.rate = rate
+        self.scatter = scatter
+        self.rng = np.random.default_rng() if rng is None else rng
+        self._table: EmitterTable | None = None
+        # Fraction of a particle owed by earlier ticks
+        self._carry = 0.0
+
+    @property
+    def table(self) -> EmitterTable:
+        if self._table is None or not self._table.is_current(self.solid):
+            self._table = EmitterTable(self.solid)
+        return self._table
+
+    def emit(self, count: int) -> Tuple[NDArray[np.float32], NDArray[np.float32]]:
+        positions, normals = self.table.sample(count, self.rng, self.scatter)
+        return positions, normals * np.float32(self.speed)
+
+    def due(self, ticks: float = 1.0) -> int:
+        # Spawns owed after ticks more of continuous emission
+        self._carry += self.rate * ticks
+        count = int(self._carry)
+        self._carry -= count
+        return count
@@ -0,0 +1,205 @@
+from typing import List, Sequence
+import numpy as np
+import moderngl as mgl
+
+from .particles import INTEGRATORS, AntiAttractor, ParticleStore, as_antiattractors
+from .solid import Solid
+from .sdf import DistanceGrid
+
+# One particle in the state buffers: position, velocity, acceleration, mass
+STATE_FORMAT = '3f 3f 3f f'
+STATE_ATTRIBUTES = ('inPosition', 'inVelocity', 'inAcceleration', 'inMass')
+STATE_STRIDE = 40
+STATE_DTYPE = np.dtype([('position', 'f4', 3), ('velocity', 'f4', 3),
+                        ('acceleration', 'f4', 3), ('mass', 'f4')])
+PLANES_LOCATION = 1
+# Anti-attractors the shader sums exactly, larger fields need the cpu backend
+MAX_SOURCES = 16
+
+STEP_SHADER = '''
+    #version 330 core
+
+    // One texel per collider face: xyz is the unit normal, w the plane offset
+    uniform sampler2D colliderPlanes;
+    uniform int colliderFaces;
+    uniform float colliderTolerance;
+    uniform bool hasSources;
+    // xyz is the coordinate, w the mass of an anti-attractor
+    uniform vec4 sources[MAX_SOURCES];
+    uniform int sourceCount;
+    // Step length in ticks and the position of the integrator in INTEGRATORS
+    uniform float dt;
+    uniform int integrator;
+
+    in vec3 inPosition;
+    in vec3 inVelocity;
+    in vec3 inAcceleration;
+    in float inMass;
+
+    out vec3 outPosition;
+    out vec3 outVelocity;
+    out vec3 outAcceleration;
+    out float outMass;
+
+    void main()
+    {
+        vec3 velocity = inVelocity;
+        if (colliderFaces > 0)
+        {
+            bool inside = true;
+            for (int i = 0; i < colliderFaces && inside; ++i)
+            {
+                vec4 plane = texelFetch(colliderPlanes, ivec2(i, 0), 0);
+                inside = dot(plane.xyz, inPosition) - plane.w <= colliderTolerance;
+            }
+            if (inside)
+            {
+                velocity = -velocity;
+            }
+        }
+        if (integrator == 0)
+        {
+            outPosition = inPosition + dt * velocity;
+            velocity += dt * inAcceleration;
+        }
+        else if (integrator == 1)
+        {
+            velocity += dt * inAcceleration;
+            outPosition = inPosition + dt * velocity;
+        }
+        else
+        {
+            velocity += dt / 2.0 * inAcceleration;
+            outPosition = inPosition + dt * velocity;
+        }
+        outAcceleration = inAcceleration;
+        if (hasSources)
+        {
+            outAcceleration = vec3(0.0);
+            for (int i = 0; i < sourceCount; ++i)
+            {
+                vec3 away = outPosition - sources[i].xyz;
+                float distance = length(away);
+                if (distance > 0.0)
+                {
+                    outAcceleration += inMass * sources[i].w * away / (distance * distance * distance);
+                }
+            }
+        }
+        if (integrator == 2)
+        {
+            velocity += dt / 2.0 * outAcceleration;
+        }
+        outVelocity = velocity;
+        outMass = inMass;
+    }
+'''
+
+class TransformFeedbackSimulation:
+    # Runs ParticleStore.step in a vertex shader. The state of every ring row lives
+    # in two GPU buffers that take turns as source and destination, the store only
+    # keeps the ring bookkeeping (head, count, birth, ttl) and the rows of new
+    # particles until they are uploaded.
+    def __init__(self, ctx: mgl.Context, store: ParticleStore) -> None:
+        self.ctx = ctx
+        self.store = store
+        self.program = ctx.program(vertex_shader=STEP_SHADER.replace('MAX_SOURCES', str(MAX_SOURCES)),
+                                   varyings=['outPosition', 'outVelocity',
+                                             'outAcceleration', 'outMass'])
+        self.buffers = [ctx.buffer(reserve=store.capacity * STATE_STRIDE, dynamic=True)
+                        for _ in range(2)]
+        self.vaos = [ctx.vertex_array(self.program, [(buffer, STATE_FORMAT, *STATE_ATTRIBUTES)])
+                     for buffer in self.buffers]
+        self.current = 0
+        # Drawing needs a complete framebuffer even with rasterization off, and a
+        # headless context has none bound
+        self.fbo = ctx.simple_framebuffer((1, 1))
+        self.planes: mgl.Texture | None = None
+        self._collider: Solid | None = None
+        self._collider_generation = -1
+
+    @property
+    def buffer(self) -> mgl.Buffer:
+        return self.buffers[self.current]
+
+    # Render vertex arrays reading positions from either state buffer
+    def vertex_arrays(self, program: mgl.Program, attribute: str) -> List[mgl.VertexArray]:
+        return [self.ctx.vertex_array(program, [(buffer, '3f 28x', attribute)])
+                for buffer in self.buffers]
+
+    def upload(self, rows: np.ndarray) -> None:
+        # rows is what ParticleStore.add returned: consecutive modulo the capacity
+        if rows.shape[0] == 0:
+            return
+        state = np.empty(rows.shape[0], dtype=STATE_DTYPE)
+        for name in STATE_DTYPE.names:
+            state[name] = self.store.take(name, rows)
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        for run in np.split(np.arange(rows.shape[0]), breaks):
+            self.buffer.write(state[run], offset=int(rows[run[0]]) * STATE_STRIDE)
+
+    def _bind_collider(self, collider: Solid | None) -> int:
+        if collider is None:
+            return 0
+        if collider is not self._collider or collider.geometry_generation != self._collider_generation:
+            planes = collider.get_face_planes()
+            if planes.shape[0] > self.ctx.info["GL_MAX_TEXTURE_SIZE"]:
+                raise RuntimeError("Collider has more faces than fit in a texture row")
+            if self.planes is not None:
+                self.planes.release()
+            self.planes = self.ctx.texture((max(planes.shape[0], 1), 1), 4, dtype='f4',
+                                           data=np.ascontiguousarray(planes).tobytes()
+                                           if planes.shape[0] > 0 else None)
+            self.planes.filter = (mgl.NEAREST, mgl.NEAREST)
+            scale = float(np.abs(planes[:, 3]).max()) if planes.shape[0] > 0 else 1.0
+            self._set('colliderTolerance', 1e-6 * max(scale, 1.0))
+            self._collider = collider
+            self._collider_generation = collider.geometry_generation
+        self.planes.use(location=PLANES_LOCATION)
+        self._set('colliderPlanes', PLANES_LOCATION)
+        return len(collider.face_labels)
+
+    def _set(self, name: str, value) -> None:
+        # The compiler drops uniforms that do not affect the output
+        if name in self.program:
+            self.program[name].value = value
+
+    def step(self, antiat: AntiAttractor | Sequence[AntiAttractor] | None = None,
+             collider: Solid | DistanceGrid | None = None, gravity: float = 0.0, dt: float = 1.0,
+             integrator: str = "euler") -> None:
+        antiats = as_antiattractors(antiat)
+        if gravity != 0.0 or len(antiats) > MAX_SOURCES:
+            raise RuntimeError("Particle gravity and large fields need the cpu backend")
+        if integrator not in INTEGRATORS:
+            raise RuntimeError(f"Unknown integrator {integrator}")
+        if isinstance(collider, DistanceGrid):
+            raise RuntimeError("Distance grid colliders need the cpu backend")
+        self._set('dt', float(dt))
+        self._set('integrator', INTEGRATORS.index(integrator))
+        self._set('colliderFaces', self._bind_collider(collider))
+        self._set('hasSources', len(antiats) > 0)
+        self._set('sourceCount', len(antiats))
+        if antiats:
+            sources = np.zeros((MAX_SOURCES, 4), dtype=np.float32)
+            sources[:len(antiats), :3] = [np.asarray(a.coord, dtype=np.float32) for a in antiats]
+            sources[:len(antiats), 3] = [a.mass for a in antiats]
+            self.program['sources'].write(sources.tobytes())
+        target = 1 - self.current
+        previous = self.ctx.fbo
+        self.fbo.use()
+        for start, stop in self.store.spans():
+            self.vaos[self.current].transform(self.buffers[target], mode=mgl.POINTS,
+                                              vertices=stop - start, first=start,
+                                              buffer_offset=start * STATE_STRIDE)
+        if previous is not None:
+            previous.use()
+        self.current = target
+        self.store.time += float(np.float32(dt))
+
+    # Live state read back from the GPU, oldest first
+    def read(self) -> np.ndarray:
+        spans = self.store.spans()
+        parts = [np.frombuffer(self.buffer.read(size=(stop - start) * STATE_STRIDE,
+                                                offset=start * STATE_STRIDE), dtype=STATE_DTYPE)
+                 for start, stop in spans]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=STATE_DTYPE)
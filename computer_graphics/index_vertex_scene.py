@@ -85,16 +85,15 @@ class LineModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_vertices()
-        indexes = solid.get_cover_line_idx()
+        buffers = solid.export_buffers(["vertex", "line_index"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.ibo = self.ctx.buffer(indexes.astype('u2').tobytes())
+        self.vbo = self.ctx.buffer(buffers["vertex"])
+        self.ibo = self.ctx.buffer(buffers["line_index"])
         self.vao = self.ctx.vertex_array(self.prog, [
             (self.vbo, '3f', 'aVertexPosition'),
             ],
             index_buffer=self.ibo,
-            index_element_size=2,
+            index_element_size=4,
         )
 
     def render(self, model: pyrr.Matrix44) -> None:
@@ -107,16 +106,15 @@ class DumbModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_vertices()
-        indexes = solid.get_cover_triangles_idx()
+        buffers = solid.export_buffers(["vertex", "index"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.ibo = self.ctx.buffer(indexes.astype('u2').tobytes())
+        self.vbo = self.ctx.buffer(buffers["vertex"])
+        self.ibo = self.ctx.buffer(buffers["index"])
         self.vao = self.ctx.vertex_array(self.prog, [
             (self.vbo, '3f', 'aVertexPosition'),
             ],
             index_buffer=self.ibo,
-            index_element_size=2,
+            index_element_size=4,
         )
 
     def render(self, model: pyrr.Matrix44) -> None:
@@ -122,15 +122,14 @@ class DumbModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_cover_triangles()
+        buffers = solid.export_buffers(["position", "normal"])
         red = (0.75, 0.09, 0.03)
         black = (0.1, 0.1, 0.1)
-        colors = np.array([red for i in range(vertices.shape[0] // 3)]).flatten()
-        normales = solid.get_normales_repeated()
+        colors = np.array([red for i in range(buffers["position"].shape[0])], dtype='f4')
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.cbo = self.ctx.buffer(colors.astype('f4').tobytes())
-        self.nbo = self.ctx.buffer(normales.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
+        self.cbo = self.ctx.buffer(colors)
+        self.nbo = self.ctx.buffer(buffers["normal"])
 
         self.vao = self.ctx.vertex_array(self.prog, [
                 (self.vbo, '3f', 'aVertexPosition'),
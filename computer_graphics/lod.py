@@ -0,0 +1,56 @@
+from typing import Callable, List, Sequence, Tuple
+import math
+import numpy as np
+import pyrr
+from .solid import Solid
+
+DEFAULT_LEVELS = (360, 90, 24, 8)
+
+class LodChain:
+    # The same revolution surface at several segment counts, finest first. factory
+    # builds one level from a segment count, e.g. createCone or createCilinder.
+    def __init__(self, factory: Callable[[int], Solid], levels: Sequence[int] = DEFAULT_LEVELS,
+                 tolerance: float = 0.5) -> None:
+        self.pieces: List[int] = sorted(set(levels), reverse=True)
+        self.solids: List[Solid] = [factory(pieces) for pieces in self.pieces]
+        # Levels that are not drawn only compose transforms until they are read
+        for solid in self.solids:
+            solid.lazy_transform = True
+        # Largest allowed screen-space deviation from the true surface, in pixels
+        self.tolerance = tolerance
+        self.level = 0
+
+    @property
+    def finest(self) -> Solid:
+        return self.solids[0]
+
+    def transform(self, matrix: pyrr.Matrix44) -> None:
+        for solid in self.solids:
+            solid.transform(matrix)
+
+    def bounding_sphere(self) -> Tuple[np.ndarray, float]:
+        # From the coarsest level, its vertices lie on the same surface
+        coords = self.solids[-1].coords.astype(np.float64)
+        center = (coords.min(axis=0) + coords.max(axis=0)) / 2
+        return center, float(np.linalg.norm(coords - center, axis=1).max())
+
+    def required_pieces(self, eye: np.ndarray, fov: float, viewport_height: int) -> float:
+        center, radius = self.bounding_sphere()
+        distance = float(np.linalg.norm(center - np.asarray(eye, dtype=np.float64))) - radius
+        if distance <= 0:
+            return math.inf
+        pixels = radius * viewport_height / (2 * math.tan(fov / 2) * distance)
+        if pixels <= self.tolerance:
+            return 0.0
+        # A segment of n pieces strays r (1 - cos(pi / n)) from the circle it replaces
+        return math.pi / math.acos(1 - self.tolerance / pixels)
+
+    def select(self, eye: np.ndarray, fov: float, viewport_height: int) -> Solid:
+        # Coarsest level whose silhouette stays within tolerance pixels of the finest
+        needed = self.required_pieces(eye, fov, viewport_height)
+        self.level = 0
+        for level in range(len(self.pieces) - 1, -1, -1):
+            if self.pieces[level] >= needed:
+                self.level = level
+                break
+        return self.solids[self.level]
@@ -172,11 +172,10 @@ class DumbModel(BaseModel):
         self.prog = program
         self.material = material
 
-        vertices = solid.get_cover_triangles()
-        normales = solid.get_normales_repeated()
+        buffers = solid.export_buffers(["position", "normal"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.nbo = self.ctx.buffer(normales.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
+        self.nbo = self.ctx.buffer(buffers["normal"])
 
         self.vao = self.ctx.vertex_array(self.prog, [
                 (self.vbo, '3f', 'aVertexPosition'),
@@ -0,0 +1,86 @@
+from typing import Any, Dict
+from enum import Enum
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+import numpy as np
+
+# Directory of the cache; "off" disables it
+CACHE_DIR_ENV = "COMPUTER_GRAPHICS_MESH_CACHE"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "computer-graphics" / "meshes"
+FORMAT_VERSION = 1
+
+# Directory used when the environment names none. The cache is opt-in: only
+# the application calls enable, so tests and library use leave home alone.
+_enabled_dir: Path | None = None
+
+# Meshes depend on the code that generates them as much as on their parameters
+SOURCE_FILES = ("solid.py", "revolution.py", "topology.py", "mesh_cache.py")
+
+
+def enable(directory: Path = DEFAULT_CACHE_DIR) -> None:
+    global _enabled_dir
+    _enabled_dir = Path(directory)
+
+def cache_dir() -> Path | None:
+    value = os.environ.get(CACHE_DIR_ENV)
+    if value == "off":
+        return None
+    return Path(value) if value else _enabled_dir
+
+@functools.lru_cache(maxsize=None)
+def source_digest() -> str:
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for name in SOURCE_FILES:
+        digest.update((package / name).read_bytes())
+    return digest.hexdigest()
+
+def to_json(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    return value
+
+def mesh_key(name: str, **params: Any) -> str:
+    payload = json.dumps([FORMAT_VERSION, source_digest(), name,
+                          {k: to_json(v) for k, v in sorted(params.items())}])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load(key: str) -> Dict[str, np.ndarray] | None:
+    directory = cache_dir()
+    if directory is None:
+        return None
+    path = directory / f"{key}.npz"
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # Missing, partially written or corrupt: regenerate
+        return None
+
+def store(key: str, arrays: Dict[str, np.ndarray]) -> None:
+    directory = cache_dir()
+    if directory is None:
+        return
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so concurrent starts never read half a file
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, directory / f"{key}.npz")
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except OSError:
+        # A read-only or full disk only costs the next start its speed-up
+        pass
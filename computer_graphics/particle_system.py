@@ -1,13 +1,20 @@
 from typing import List, Callable, Any
 
 import math
-import random as rand
 import numpy as np
 import pyrr
 import moderngl as mgl
 
 from .base import WindowBase
 from .solid import Solid, createDodecahedron, createCube, createCone, createCilinder
+from .lod import LodChain
+from .particles import AntiAttractor, ParticleStore
+from .gpu_particles import TransformFeedbackSimulation
+from .shared_particles import SharedParticleStore, ShardedSimulation
+from .emitter import Emitter
+from .streaming import StreamingBuffer
+from .timestep import FixedTimestep
+from .sdf import DistanceGrid
 
 class ParticleScene(WindowBase):
     title = 'Hello Program'
@@ -80,9 +87,9 @@ class ParticleScene(WindowBase):
 
         snowflake_texture = self.load_texture_2d('/home/aaletov/uni/7sem/computer-graphics/snowflake.png')
         antiat = AntiAttractor(pyrr.Vector3(np.array([-2.0, 2.0, 2.0]), dtype='f4'), 1e+8)
-        cone = createCone()
-        cil = createCilinder()
-        cube = createCube()
+        cone_lod = LodChain(createCone)
+        cil_lod = LodChain(createCilinder)
+        cone = cone_lod.finest
         anticube = createCube()
 
         anticube_scale = pyrr.Matrix44.from_scale(np.array([0.2, 0.2, 0.2]), dtype='f4')
@@ -93,15 +100,17 @@ class ParticleScene(WindowBase):
         cil_rot_z = pyrr.Matrix44.from_z_rotation(math.pi / 2, dtype='f4')
         cil_rot_y = pyrr.Matrix44.from_y_rotation(math.pi / 4, dtype='f4')
         cil_trans = pyrr.Matrix44.from_translation(np.array([2.0, 2.0, -1.0]), dtype='f4')
-        cil.transform(cil_trans * cil_rot_y * cil_rot_z * cil_scale)
-        cube.transform(cil_trans * cil_rot_y * cil_rot_z * cil_scale)
+        cil_lod.transform(cil_trans * cil_rot_y * cil_rot_z * cil_scale)
+        # Particles bounce off the drawn cylinder, the 90 piece level is as smooth
+        # as the grid resolves
+        cil_grid = DistanceGrid(cil_lod.solids[cil_lod.pieces.index(90)])
 
         self.particle_system = ParticleSystem(self.ctx, self.particle_prog, 
-                                              snowflake_texture, cone, cube, antiat)
+                                              snowflake_texture, cone, cil_grid, antiat)
 
         self.anticube = DumbModel(self.ctx, self.solid_prog, anticube)
-        self.emitter = DumbModel(self.ctx, self.solid_prog, cone)
-        self.collider = DumbModel(self.ctx, self.solid_prog, cil)
+        self.emitter = LodModel(self.ctx, self.solid_prog, cone_lod)
+        self.collider = LodModel(self.ctx, self.solid_prog, cil_lod)
 
     def render(self, time: float, frame_time: float):
         self.ctx.enable(mgl.DEPTH_TEST | mgl.PROGRAM_POINT_SIZE | mgl.BLEND)
@@ -114,8 +123,9 @@ class ParticleScene(WindowBase):
 
         perspective = pyrr.Matrix44.perspective_projection(fieldOfView, 
                                                             aspect, zNear, zFar, dtype='f4')
+        cameraPos = (0, 100, 200)
         lookat = pyrr.Matrix44.look_at(
-            (0, 100, 200),
+            cameraPos,
             (0.0, 0.0, 0.0),
             (0.0, 1.0, 0.0),
             dtype='f4'
@@ -127,39 +137,16 @@ class ParticleScene(WindowBase):
         self.particle_prog["mvp"].write(mvp.tobytes())
         self.particle_prog["emmiterPos"].write(np.array([0.0, 0.0, 0.0], dtype='f4').tobytes())
         self.anticube.render()
-        self.emitter.render()
-        self.collider.render()
-        self.particle_system.tick()
+        self.emitter.render(cameraPos, fieldOfView, self.window_size[1])
+        self.collider.render(cameraPos, fieldOfView, self.window_size[1])
+        self.particle_system.update(frame_time)
         self.particle_system.render()
 
-class AntiAttractor:
-    def __init__(self, coord: pyrr.Vector3, mass: float):
-        self.coord = coord
-        self.mass = mass
-
-class Particle:
-    def __init__(self, coord: pyrr.Vector3, mass: float, velocity: pyrr.Vector3,
-                 acceleration: pyrr.Vector3, collider: Solid, antiat: AntiAttractor):
-        self.coord = coord
-        self.mass = mass
-        self.velocity = velocity
-        self.acceleration = acceleration
-        self.collider = collider
-        self.antiat = antiat
-
-    def tick(self):
-        if self.collider.is_in(self.coord):
-            self.velocity = - self.velocity
-        self.coord = self.coord + self.velocity
-        self.velocity = self.velocity + self.acceleration
-        antivector = self.coord - self.antiat.coord
-        antivector = antivector / np.power(np.linalg.norm(antivector), 3)
-        self.acceleration = self.mass * self.antiat.mass * antivector
-
-
 class ParticleSystem:
     def __init__(self, ctx: mgl.Context, program: mgl.Program, texture: mgl.Texture,
-                 emitter: Solid, collider: Solid, antiat: AntiAttractor):
+                 emitter: Solid, collider: Solid | DistanceGrid, antiat: AntiAttractor | List[AntiAttractor],
+                 capacity: int = 1 << 16, backend: str = "cpu", copies: int = 1,
+                 workers: int | None = None):
         self.ctx = ctx
         self.program = program
         self.texture = texture
@@ -167,70 +154,127 @@ class ParticleSystem:
         self.collider = collider
         self.antiat = antiat
         self.mass = 1e-9
-        self.starting_velocity = 0.2
-        self.particles: List[Particle] = []
-        self.max_age = 50
-
-        self.vbo = self.ctx.buffer(dynamic=True, reserve=4096)
-
-        self.vao = self.ctx.vertex_array(self.program, [
-                (self.vbo, '3f', 'aPointPosition'),
-            ],
-        )
-
-    def gen(self):
-        faces_count = len(self.emitter.graph["faces"])
-        face_idx = self.emitter.graph["faces"][rand.randint(0, faces_count - 1)]
-        vertices = filter(lambda v: face_idx in v["faces"], self.emitter.graph.vs)
-        vcoords = np.array([v["coord"] for v in vertices])
-        coord = np.average(vcoords, axis=0)
-        normal = self.emitter.get_face_normal(face_idx)
-        velocity = self.starting_velocity * (normal / np.linalg.norm(normal))
-
-        self.particles.append(Particle(coord, self.mass, velocity,
-                                       pyrr.Vector3(), self.collider, self.antiat))
-        
+        # Lifetime in ticks of the particles spawned from now on. Particles
+        # retire oldest first: after lowering ttl, expired newer particles stay
+        # alive, stepped and drawn until the older ones ahead of them expire
+        self.ttl = 50.0
+        # Particle-particle attraction, 0 disables it
+        self.gravity = 0.0
+        # A tick is a 60th of a second whatever the frame rate, split into substeps
+        # of the integrator
+        self.timestep = FixedTimestep(1 / 60)
+        self.substeps = 1
+        self.integrator = "verlet"
+        # Particles closer than radius push each other apart with separation and
+        # bounce off each other with restitution, 0 radius disables both
+        self.radius = 0.0
+        self.separation = 0.0
+        self.restitution: float | None = None
+        self.store = SharedParticleStore(capacity) if backend == "parallel" else ParticleStore(capacity)
+        # One particle per tick off the emitter faces at speed 0.2
+        self.emission = Emitter(emitter, speed=0.2, rate=1.0)
+
+        # "gpu" keeps the particle state in GPU buffers and steps it with transform
+        # feedback, "cpu" steps the store and streams positions every frame from
+        # copies buffers, see StreamingBuffer. "parallel" is "cpu" with the store in
+        # shared memory, stepped in shards by workers processes and streamed
+        # straight from the shared arrays
+        self.simulation: TransformFeedbackSimulation | None = None
+        self.shards: ShardedSimulation | None = None
+        if backend == "gpu":
+            self.simulation = TransformFeedbackSimulation(self.ctx, self.store)
+            self.vaos = self.simulation.vertex_arrays(self.program, 'aPointPosition')
+        elif backend in ("cpu", "parallel"):
+            if backend == "parallel":
+                self.shards = ShardedSimulation(self.store, workers)
+            self.stream = StreamingBuffer(self.ctx, self.program, '3f', ['aPointPosition'],
+                                          stride=12, copies=copies)
+        else:
+            raise RuntimeError(f"Unknown particle backend {backend}")
+
+    # Spawns count particles at once, tick adds the ones the emission rate owes
+    def gen(self, count: int = 1):
+        if count <= 0:
+            return
+        positions, velocities = self.emission.emit(count)
+        rows = self.store.add(positions, velocities, self.mass, self.ttl)
+        if self.simulation is not None:
+            self.simulation.upload(rows)
+
+    # Runs the ticks frame_time seconds cover
+    def update(self, frame_time: float):
+        for _ in range(self.timestep.advance(frame_time)):
+            self.tick()
+
+    # Particles retire once the step makes them ttl ticks old, so each is drawn
+    # at ages 0 to ttl - 1 and a rate of one per tick keeps ttl alive
     def tick(self):
-        if len(self.particles) == self.max_age:
-            self.particles.pop(0)
-        for p in self.particles:
-            p.tick()
-
-        self.gen()
+        simulation = self.simulation or self.shards or self.store
+        for _ in range(self.substeps):
+            simulation.step(self.antiat, self.collider, self.gravity,
+                            dt=1 / self.substeps, integrator=self.integrator)
+            if self.radius > 0:
+                if self.simulation is not None:
+                    raise RuntimeError("Particle interactions need the cpu backend")
+                self.store.interact(self.radius, self.separation, self.restitution,
+                                    dt=1 / self.substeps)
+        self.store.retire()
+        self.gen(self.emission.due())
+
+    # Stops the workers and frees the shared store of the parallel backend
+    def close(self):
+        if self.shards is not None:
+            self.shards.close()
+            self.store.close()
+            self.shards = None
 
     def get_points_array(self) -> np.ndarray:
-        return np.array([p.coord for p in self.particles], dtype='f4')
+        if self.simulation is not None:
+            return np.ascontiguousarray(self.simulation.read()["position"])
+        return self.store.position
 
     def render(self):
-        self.vbo.clear()
-        self.vbo.write(self.get_points_array().astype('f4').tobytes(), offset=0)
-
         self.texture.use()
-        self.vao.render(mode=mgl.POINTS)
-    
+        if self.simulation is not None:
+            for start, stop in self.store.spans():
+                self.vaos[self.simulation.current].render(mode=mgl.POINTS, first=start,
+                                                          vertices=stop - start)
+        else:
+            # The live spans of the ring, packed oldest first
+            self.stream.write(self.store.views("position"))
+            self.stream.render(mgl.POINTS)
+
 class DumbModel:
     def __init__(self, ctx: mgl.Context, program: mgl.Program, solid: Solid) -> None:
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_vertices()
-        indexes = solid.get_cover_triangles_idx()
+        buffers = solid.export_buffers(["vertex", "index"])
         f = lambda x: (0.1, 0.1, 0.1, 0.5) if x % 2 == 0 else (0.75, 0.09, 0.03, 0.5)
-        colors = np.array([f(i) for i in range(indexes.shape[0])])
+        colors = np.array([f(i) for i in range(buffers["index"].shape[0])], dtype='f4')
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.cbo = self.ctx.buffer(colors.astype('f4').tobytes())
-        self.ibo = self.ctx.buffer(indexes.astype('u2').tobytes())
+        self.vbo = self.ctx.buffer(buffers["vertex"])
+        self.cbo = self.ctx.buffer(colors)
+        self.ibo = self.ctx.buffer(buffers["index"])
         self.vao = self.ctx.vertex_array(self.prog, [
                 (self.vbo, '3f', 'aVertexPosition'),
                 (self.cbo, '4f', 'aVertexColor'),
             ],
             index_buffer=self.ibo,
-            index_element_size=2,
+            index_element_size=4,
         )
 
     def render(self) -> None:
         self.vao.render(mode=mgl.TRIANGLES)
+
+class LodModel:
+    def __init__(self, ctx: mgl.Context, program: mgl.Program, chain: LodChain) -> None:
+        self.chain = chain
+        self.models = [DumbModel(ctx, program, solid) for solid in chain.solids]
+
+    def render(self, eye: pyrr.Vector3, fov: float, viewport_height: int) -> None:
+        self.chain.select(eye, fov, viewport_height)
+        self.models[self.chain.level].render()
         
 
 if __name__ == '__main__':
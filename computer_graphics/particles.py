@@ -0,0 +1,228 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pyrr
+from numpy.typing import NDArray
+from .solid import Solid
+from .forces import ForceField
+from .sdf import DistanceGrid
+from .spatial_hash import SpatialHash
+
+
+class AntiAttractor:
+    def __init__(self, coord: pyrr.Vector3, mass: float):
+        self.coord = coord
+        self.mass = mass
+
+
+# euler: move with the old velocity, then accelerate, the original update
+# symplectic: accelerate, then move with the new velocity
+# verlet: velocity Verlet, second order and time reversible
+INTEGRATORS = ("euler", "symplectic", "verlet")
+
+
+def as_antiattractors(antiat: AntiAttractor | Sequence[AntiAttractor] | None) -> List[AntiAttractor]:
+    if antiat is None:
+        return []
+    if isinstance(antiat, AntiAttractor):
+        return [antiat]
+    return list(antiat)
+
+
+class ParticleStore:
+    # Fixed-capacity ring in structure-of-arrays layout: the count live particles
+    # are the rows from head on, wrapping past the end, oldest first. time counts
+    # steps, a particle lives from birth until birth + ttl.
+    FIELDS: Dict[str, tuple] = {
+        "position": (3, np.float32),
+        "velocity": (3, np.float32),
+        "acceleration": (3, np.float32),
+        "mass": (1, np.float32),
+        "birth": (1, np.float64),
+        "ttl": (1, np.float64),
+    }
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        if capacity < 1:
+            raise RuntimeError("Particle store needs a positive capacity")
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.time = 0.0
+        self._arrays: Dict[str, np.ndarray] = {
+            name: self._allocate((capacity, width) if width > 1 else (capacity,), dtype)
+            for name, (width, dtype) in ParticleStore.FIELDS.items()
+        }
+
+    def _allocate(self, shape: Tuple[int, ...], dtype: type) -> np.ndarray:
+        return np.zeros(shape, dtype=dtype)
+
+    # Live rows as at most two [start, stop) ranges, oldest first
+    def spans(self) -> List[Tuple[int, int]]:
+        end = self.head + self.count
+        if self.count == 0:
+            return []
+        if end <= self.capacity:
+            return [(self.head, end)]
+        return [(self.head, self.capacity), (0, end - self.capacity)]
+
+    def views(self, name: str) -> List[np.ndarray]:
+        return [self._arrays[name][start:stop] for start, stop in self.spans()]
+
+    def take(self, name: str, rows: np.ndarray) -> np.ndarray:
+        return self._arrays[name][rows]
+
+    # Copy of a field over the live particles, oldest first
+    def gather(self, name: str) -> np.ndarray:
+        array = self._arrays[name]
+        views = self.views(name)
+        return np.concatenate(views) if views else array[:0].copy()
+
+    # Inverse of gather: values for the live particles, oldest first
+    def scatter(self, name: str, values: np.ndarray) -> None:
+        done = 0
+        for view in self.views(name):
+            view[:] = values[done:done + view.shape[0]]
+            done += view.shape[0]
+
+    @property
+    def position(self) -> NDArray[np.float32]:
+        return self.gather("position")
+
+    @property
+    def velocity(self) -> NDArray[np.float32]:
+        return self.gather("velocity")
+
+    @property
+    def acceleration(self) -> NDArray[np.float32]:
+        return self.gather("acceleration")
+
+    @property
+    def mass(self) -> NDArray[np.float32]:
+        return self.gather("mass")
+
+    @property
+    def age(self) -> NDArray[np.float64]:
+        return self.time - self.gather("birth")
+
+    def _rows(self, first: int, n: int) -> np.ndarray:
+        return (self.head + first + np.arange(n)) % self.capacity
+
+    def _pop(self, n: int) -> None:
+        self.head = (self.head + n) % self.capacity
+        self.count -= n
+
+    def add(self, position: np.ndarray, velocity: np.ndarray, mass: float | np.ndarray,
+            ttl: float | np.ndarray, acceleration: np.ndarray | None = None) -> np.ndarray:
+        # A full ring makes room by retiring its oldest particles. Returns the rows written.
+        position = np.asarray(position, dtype=np.float32).reshape((-1, 3))
+        velocity = np.asarray(velocity, dtype=np.float32).reshape((-1, 3))
+        columns = {
+            "position": position,
+            "velocity": velocity,
+            "acceleration": np.zeros_like(position) if acceleration is None
+            else np.asarray(acceleration, dtype=np.float32).reshape((-1, 3)),
+            "mass": np.broadcast_to(np.asarray(mass, dtype=np.float32), position.shape[:1]),
+            "birth": np.full(position.shape[0], self.time),
+            "ttl": np.broadcast_to(np.asarray(ttl, dtype=np.float64), position.shape[:1]),
+        }
+        n = min(position.shape[0], self.capacity)
+        self._pop(max(0, self.count + n - self.capacity))
+        rows = self._rows(self.count, n)
+        for name, column in columns.items():
+            self._arrays[name][rows] = column[column.shape[0] - n:]
+        self.count += n
+        return rows
+
+    def retire(self) -> int:
+        # Pops expired particles off the head. The windows double, so the work is
+        # proportional to the number retired. Retirement keeps spawn order: with
+        # varying ttl an expired particle waits for the older ones ahead of it.
+        retired = 0
+        window = 1
+        while self.count > 0:
+            rows = self._rows(0, min(window, self.count))
+            alive = self._arrays["birth"][rows] + self._arrays["ttl"][rows] > self.time
+            if alive.any():
+                n = int(np.argmax(alive))
+                self._pop(n)
+                return retired + n
+            self._pop(rows.shape[0])
+            retired += rows.shape[0]
+            window *= 2
+        return retired
+
+    def step(self, antiat: AntiAttractor | Sequence[AntiAttractor] | None = None,
+             collider: Solid | DistanceGrid | None = None, gravity: float = 0.0, dt: float = 1.0,
+             integrator: str = "euler") -> None:
+        # Advances every particle by dt ticks, see INTEGRATORS
+        if integrator not in INTEGRATORS:
+            raise RuntimeError(f"Unknown integrator {integrator}")
+        spans = [slice(start, stop) for start, stop in self.spans()]
+        dt = np.float32(dt)
+        for rows in spans:
+            self._move_rows(rows, collider, dt, integrator)
+        forces = self.force_field(antiat, gravity)
+        for rows in spans:
+            self._force_rows(rows, forces, dt, integrator)
+        self.time += float(dt)
+
+    def _move_rows(self, rows: slice, collider: Solid | DistanceGrid | None, dt: np.float32,
+                   integrator: str) -> None:
+        # Bounce off the collider, then the integrator's update up to the new
+        # acceleration, which follows once every particle has moved
+        position = self._arrays["position"][rows]
+        velocity = self._arrays["velocity"][rows]
+        acceleration = self._arrays["acceleration"][rows]
+        if isinstance(collider, DistanceGrid):
+            collider.collide(position, velocity)
+        elif collider is not None:
+            # Convex solids only turn the particle around
+            inside = collider.contains_many(position)
+            velocity[inside] = -velocity[inside]
+        if integrator == "euler":
+            position += dt * velocity
+            velocity += dt * acceleration
+        elif integrator == "symplectic":
+            velocity += dt * acceleration
+            position += dt * velocity
+        else:
+            # Half a kick with the old acceleration now, half with the new one after
+            velocity += dt / 2 * acceleration
+            position += dt * velocity
+
+    def _force_rows(self, rows: slice, forces: ForceField | None, dt: np.float32,
+                    integrator: str) -> None:
+        # The new acceleration, and the second half kick of verlet
+        acceleration = self._arrays["acceleration"][rows]
+        if forces is not None:
+            acceleration[:] = self._arrays["mass"][rows, None] * \
+                forces.field(self._arrays["position"][rows])
+        if integrator == "verlet":
+            self._arrays["velocity"][rows] += dt / 2 * acceleration
+
+    def interact(self, radius: float, separation: float = 0.0,
+                 restitution: float | None = None, dt: float = 1.0) -> SpatialHash:
+        # Particle-particle contact within radius through a SpatialHash: a
+        # separation push, then elastic bounces when restitution is given
+        grid = SpatialHash(self.position, radius)
+        velocity = self.velocity.astype(np.float64)
+        if separation != 0.0:
+            velocity += dt * grid.separation(radius, separation)
+        if restitution is not None:
+            velocity += grid.collide(velocity, radius, restitution)
+        self.scatter("velocity", velocity)
+        return grid
+
+    def force_field(self, antiat: AntiAttractor | Sequence[AntiAttractor] | None,
+                    gravity: float) -> ForceField | None:
+        # Anti-attractors push with their mass. gravity > 0 makes every particle
+        # attract the others in proportion to its own mass.
+        antiats = as_antiattractors(antiat)
+        if not antiats and gravity == 0.0:
+            return None
+        coords = [np.array([np.asarray(a.coord, dtype=np.float64) for a in antiats]).reshape((-1, 3))]
+        strengths = [np.array([a.mass for a in antiats], dtype=np.float64)]
+        if gravity != 0.0:
+            coords.append(self.position)
+            strengths.append(-gravity * self.mass.astype(np.float64))
+        return ForceField(np.concatenate(coords), np.concatenate(strengths))
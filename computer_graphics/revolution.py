@@ -45,6 +45,30 @@ def rotate_line(line: List[pyrr.Vector3], axis: Axis, angle: np.float64) -> List
     converter = lambda p: rotate_vertex(p, axis, angle)
     return list(map(converter, line))
 
+def axis_vector(axis: Axis | np.ndarray) -> np.ndarray:
+    vectors = {
+        Axis.X: (1.0, 0.0, 0.0),
+        Axis.Y: (0.0, 1.0, 0.0),
+        Axis.Z: (0.0, 0.0, 1.0),
+    }
+    vector = np.asarray(vectors[axis] if isinstance(axis, Axis) else axis, dtype=np.float64)
+    norm = np.linalg.norm(vector)
+    if vector.shape != (3,) or norm == 0:
+        raise RuntimeError(f"Invalid axis {axis}")
+    return vector / norm
+
+def revolve_line(line: List[pyrr.Vector3] | np.ndarray, axis: Axis | np.ndarray,
+                 angles: np.ndarray) -> np.ndarray:
+    # Every profile point rotated by every angle at once: (rows, len(angles), 3).
+    # Rodrigues' formula, turning the same way as the get_rotation_matrix_* row-vector
+    # products, i.e. clockwise when looking down the axis.
+    k = axis_vector(axis)
+    points = np.asarray(line, dtype=np.float64).reshape((-1, 1, 3))
+    cos = np.cos(angles)[None, :, None]
+    sin = -np.sin(angles)[None, :, None]
+    return (points * cos + np.cross(k, points) * sin
+            + k * (points @ k)[..., None] * (1 - cos))
+
 def connect_revolution_line(graph: ig.Graph, prev_keys: List[str], curr_keys: List[str]) -> None:
     graph.add_edges(es=list(zip(prev_keys, curr_keys)))
     return
@@ -108,25 +132,108 @@ def get_mesh_graph(shape=Tuple[int,int]) -> ig.Graph:
     return graph
     
 
-def create_revolution_graph(line: List[pyrr.Vector3], axis: Axis) -> List[pyrr.Vector3]:
-    PIECES_NUM = 360
-    ROTATIONS_NUM = PIECES_NUM - 1
-    DELTA = (2 * math.pi) / PIECES_NUM
-
-    shape = (len(line), PIECES_NUM)
+def grid_ids(rows: int, pieces: int, apex: np.ndarray | None = None) -> np.ndarray:
+    # (rows, pieces) vertex index of every grid node. An apex row lies on the axis
+    # and is a single vertex that all of its nodes share.
+    if apex is None:
+        return np.arange(rows * pieces, dtype=np.int32).reshape((rows, pieces))
+    sizes = np.where(apex, 1, pieces)
+    starts = np.cumsum(sizes) - sizes
+    return (starts[:, None] + np.where(apex[:, None], 0, np.arange(pieces))).astype(np.int32)
+
+def grid_edges(rows: int, pieces: int, apex: np.ndarray | None = None) -> np.ndarray:
+    # Same order as get_mesh_graph followed by the seam edges of create_revolution_graph:
+    # along rows, then down columns, then the seam of every row
+    idx = grid_ids(rows, pieces, apex)
+    rings = idx[:, 0] != idx[:, -1]
+    along = np.stack([idx[rings, :-1], idx[rings, 1:]], axis=-1).reshape((-1, 2))
+    down = np.stack([idx[:-1, :], idx[1:, :]], axis=-1).transpose((1, 0, 2)).reshape((-1, 2))
+    seam = np.stack([idx[rings, 0], idx[rings, -1]], axis=-1)
+    return np.concatenate([along, down, seam])
+
+def grid_faces(rows: int, pieces: int, apex: np.ndarray | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Face loops as CSR (face_ptr, face_vertices): the quads row by row, then the seam
+    # quad of every row. Loops start at the lowest vertex and step to its larger
+    # neighbour, which is the order Topology would find for them. Next to an apex
+    # row the quads lose their doubled vertex and become triangles.
+    idx = grid_ids(rows, pieces, apex)
+    a = idx[:-1, :]
+    b = np.roll(idx, -1, axis=1)[:-1, :]
+    c = np.roll(idx, -1, axis=1)[1:, :]
+    d = idx[1:, :]
+    quads = np.stack([a, d, c, b], axis=-1)
+    quads[:, -1] = np.stack([b[:, -1], c[:, -1], d[:, -1], a[:, -1]], axis=-1)
+    loops = np.concatenate([quads[:, :-1].reshape((-1, 4)), quads[:, -1]])
+    keep = loops != np.roll(loops, 1, axis=1)
+    face_ptr = np.zeros(loops.shape[0] + 1, dtype=np.int32)
+    np.cumsum(keep.sum(axis=1), out=face_ptr[1:])
+    return face_ptr, loops[keep]
+
+RevolutionArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]
+
+def revolution_arrays(line: List[pyrr.Vector3], axis: Axis | np.ndarray, pieces: int = 360,
+                      caps: bool = False, weld: bool = True) -> RevolutionArrays:
+    # create_revolution_graph without the graph: coords, edges, face_ptr, face loops and
+    # face labels, ready for Solid.from_arrays(..., ordered=True).
+    # Profile points on the axis become a single apex vertex. caps closes every end
+    # of the profile that is off the axis with a flat fan around the axis. Welded caps
+    # share the rim vertices with the side, so the mesh is closed; unwelded caps get
+    # their own rim, which keeps the edge sharp under smooth normals.
+    if pieces < 3:
+        raise RuntimeError(f"Need at least 3 pieces, got {pieces}")
+    k = axis_vector(axis)
+    points = np.asarray(line, dtype=np.float64).reshape((-1, 3))
+    centers = (points @ k)[:, None] * k
+    scale = max(float(np.abs(points).max(initial=0.0)), 1.0)
+    apex = np.linalg.norm(points - centers, axis=1) <= 1e-9 * scale
+
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+    if caps:
+        if weld:
+            if not apex[0]:
+                points, apex = np.r_[centers[:1], points], np.r_[True, apex]
+            if not apex[-1]:
+                points, apex = np.r_[points, centers[-1:]], np.r_[apex, True]
+        else:
+            for end in sorted({0, points.shape[0] - 1}):
+                if not apex[end]:
+                    parts.append(revolution_arrays([points[end], centers[end]], k, pieces)[:4])
+    if np.any(apex[:-1] & apex[1:]):
+        raise RuntimeError("Profile runs along the axis")
+
+    rows = points.shape[0]
+    idx = grid_ids(rows, pieces, apex)
+    angles = np.arange(pieces) * (2 * math.pi / pieces)
+    coords = np.empty((int(idx.max()) + 1, 3), dtype=np.float64)
+    coords[idx] = revolve_line(points, k, angles)
+    coords[idx[apex, 0]] = points[apex]
+    face_ptr, face_vertices = grid_faces(rows, pieces, apex)
+    parts.insert(0, (coords, grid_edges(rows, pieces, apex), face_ptr, face_vertices))
+
+    # Caps built separately are appended as further components
+    coords = np.concatenate([part[0] for part in parts])
+    offsets = np.cumsum([0] + [part[0].shape[0] for part in parts])
+    face_offsets = np.cumsum([0] + [part[3].shape[0] for part in parts])
+    edges = np.concatenate([part[1] + offset for part, offset in zip(parts, offsets)])
+    face_vertices = np.concatenate([part[3] + offset for part, offset in zip(parts, offsets)])
+    face_ptr = np.concatenate([parts[0][2][:1]] + [part[2][1:] + offset
+                                                    for part, offset in zip(parts, face_offsets)])
+    labels = [str(f) for f in range(face_ptr.shape[0] - 1)]
+    return coords, edges.astype(np.int32), face_ptr.astype(np.int32), face_vertices.astype(np.int32), labels
+
+def create_revolution_graph(line: List[pyrr.Vector3], axis: Axis | np.ndarray,
+                            pieces: int = 360) -> ig.Graph:
+    if pieces < 3:
+        raise RuntimeError(f"Need at least 3 pieces, got {pieces}")
+    DELTA = (2 * math.pi) / pieces
+
+    shape = (len(line), pieces)
     graph = get_mesh_graph(shape=shape)
-    for i in range(len(line)):
-        v_idx = i * shape[1]
-        graph.vs[v_idx]["coord"] = line[i]
-
-    angles = np.linspace(0 + DELTA, 2 * math.pi, num=ROTATIONS_NUM, endpoint=False)
-    for j, angle in enumerate(angles, start=1):
-        rotated_line = rotate_line(line, axis, angle)
-        for i, row in enumerate(range(shape[0])):
-            v_idx = row * shape[1] + j
-            graph.vs[v_idx]["coord"] = rotated_line[i]
-
-    graph["pieces"] = PIECES_NUM
+    # Vertex i * pieces + j is profile point i turned by j * DELTA
+    angles = np.arange(pieces) * DELTA
+    graph.vs["coord"] = revolve_line(line, axis, angles).reshape((-1, 3))
+
+    graph["pieces"] = pieces
 
     for i in range(shape[0]):
         s_idx = i * shape[1]
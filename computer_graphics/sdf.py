@@ -0,0 +1,151 @@
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .solid import Solid
+
+
+class DistanceGrid:
+    # Signed distance to a closed Solid, negative inside, sampled at the corners
+    # of a regular grid over its bounds plus margin. Rebuilt on first use after
+    # the solid is transformed.
+    def __init__(self, solid: Solid, resolution: int = 32, margin: float = 0.1) -> None:
+        self.solid: Solid | None = solid
+        self.resolution = resolution
+        self.margin = margin
+        self._build(solid)
+
+    # Copies sent to other processes leave the solid behind and are refreshed by
+    # their sender, see ShardedSimulation
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "solid": None}
+
+    def refresh(self) -> None:
+        if self.solid is not None and not self.is_current(self.solid):
+            self._build(self.solid)
+
+    def _build(self, solid: Solid) -> None:
+        resolution, margin = self.resolution, self.margin
+        self.generation = (solid.topology_generation, solid.geometry_generation)
+        coords = solid.coords.astype(np.float64)
+        lo, hi = coords.min(axis=0), coords.max(axis=0)
+        self.cell = float((hi - lo).max()) / resolution
+        if self.cell <= 0:
+            raise RuntimeError("Distance grid needs a solid with volume")
+        pad = margin * float((hi - lo).max()) + self.cell
+        self.lo = lo - pad
+        self.shape = tuple(int(n) for n in np.ceil((hi + pad - self.lo) / self.cell).astype(int) + 1)
+        axes = [self.lo[axis] + self.cell * np.arange(self.shape[axis]) for axis in range(3)]
+        points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+        nearest = self._nearest_surface(solid, points)
+        distance = np.linalg.norm(points - nearest, axis=-1)
+        inside = self._inside(solid, points)
+        self.values = np.where(inside, -distance, distance).astype(np.float32)
+
+    def _nearest_surface(self, solid: Solid, points: np.ndarray) -> NDArray[np.float64]:
+        # Exact closest surface points for the grid points next to a triangle,
+        # handed on to the rest of the grid by jump flooding
+        bvh = solid.get_bvh()
+        corners = solid.coords[solid.topology.triangles].astype(np.float64)
+        band = 1.5 * self.cell
+        first = np.floor((corners.min(axis=1) - band - self.lo) / self.cell).astype(np.int64)
+        last = np.ceil((corners.max(axis=1) + band - self.lo) / self.cell).astype(np.int64)
+        first = np.clip(first, 0, np.array(self.shape) - 1)
+        last = np.clip(last, 0, np.array(self.shape) - 1)
+        # Every grid point of every triangle's box in one pass: box k of
+        # sizes (a, b, c) owns a * b * c rows, row r of it the point
+        # first + (r // (b * c), r // c % b, r % c)
+        sizes = last - first + 1
+        volume = sizes.prod(axis=1)
+        box = np.repeat(np.arange(corners.shape[0]), volume)
+        row = np.arange(box.shape[0]) - np.repeat(np.cumsum(volume) - volume, volume)
+        inner = sizes[box, 2]
+        offset = np.stack([row // (sizes[box, 1] * inner), row // inner % sizes[box, 1],
+                           row % inner], axis=1)
+        candidates = np.unique(np.ravel_multi_index(tuple((first[box] + offset).T), self.shape))
+        distance, closest, _ = bvh.closest_points(points.reshape((-1, 3))[candidates], band)
+        seeded = np.isfinite(distance)
+        if not seeded.any():
+            raise RuntimeError("Distance grid found no surface")
+
+        nearest = np.full(points.shape, np.nan)
+        nearest.reshape((-1, 3))[candidates[seeded]] = closest[seeded]
+        best = np.where(np.isnan(nearest[..., 0]), np.inf,
+                        np.linalg.norm(points - nearest, axis=-1))
+        offsets = [np.array(o) for o in np.ndindex(3, 3, 3) if o != (1, 1, 1)]
+        step = 1 << int(np.log2(max(self.shape) - 1))
+        while step >= 1:
+            for offset in offsets:
+                shift = (offset - 1) * step
+                target = tuple(slice(max(0, -d), max(0, n - d)) for d, n in zip(shift, self.shape))
+                source = tuple(slice(max(0, d), max(0, n + d)) for d, n in zip(shift, self.shape))
+                candidate = nearest[source]
+                d = np.linalg.norm(points[target] - candidate, axis=-1)
+                better = d < best[target]
+                nearest[target][better] = candidate[better]
+                best[target][better] = d[better]
+            step //= 2
+        return nearest
+
+    def _inside(self, solid: Solid, points: np.ndarray) -> NDArray[np.bool_]:
+        # One ray down every grid line along each axis. A point is inside when
+        # most of its lines cross the surface an odd number of times before it.
+        bvh = solid.get_bvh()
+        votes = np.zeros(self.shape, dtype=np.int64)
+        for axis in range(3):
+            lines = np.moveaxis(points, axis, 0)[0].reshape((-1, 3))
+            # Nudged off the grid planes, where mesh edges and vertices often lie
+            origins = lines + self.cell * 1e-4 * np.roll([0.0, 0.37, 0.71], axis)
+            origins[:, axis] -= self.cell
+            direction = np.zeros(3)
+            direction[axis] = 1.0
+            rays, _, t = bvh.ray_hits(origins, np.broadcast_to(direction, origins.shape))
+            # A hit toggles every grid point after it on the line
+            after = np.minimum(np.floor(t / self.cell).astype(np.int64), self.shape[axis])
+            toggles = np.zeros((lines.shape[0], self.shape[axis] + 1), dtype=np.int64)
+            np.add.at(toggles, (rays, after), 1)
+            crossings = np.cumsum(toggles[:, :-1], axis=1)
+            other = [n for a, n in enumerate(self.shape) if a != axis]
+            votes += np.moveaxis(crossings.reshape(other + [self.shape[axis]]) % 2, -1, axis)
+        return votes >= 2
+
+    def is_current(self, solid: Solid) -> bool:
+        return self.generation == (solid.topology_generation, solid.geometry_generation)
+
+    def sample(self, points: np.ndarray) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+        # Trilinear distance and its gradient. Past the grid the distance grows
+        # with the distance to it and the gradient points away from it.
+        self.refresh()
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        hi = self.lo + self.cell * (np.array(self.shape) - 1)
+        clamped = np.clip(points, self.lo, hi)
+        u = (clamped - self.lo) / self.cell
+        cells = np.clip(np.floor(u).astype(np.int64), 0, np.array(self.shape) - 2)
+        f = u - cells
+        # (N, 2, 2, 2) corner values, weights and weight slopes along each axis
+        corners = np.stack([self.values[tuple((cells + offset).T)]
+                            for offset in np.ndindex(2, 2, 2)], axis=1).reshape((-1, 2, 2, 2))
+        w = [np.stack([1 - f[:, axis], f[:, axis]], axis=1) for axis in range(3)]
+        slope = np.broadcast_to(np.array([-1.0, 1.0]) / self.cell, (points.shape[0], 2))
+        distance = np.einsum('nijk,ni,nj,nk->n', corners, *w)
+        gradient = np.stack([np.einsum('nijk,ni,nj,nk->n', corners, slope, w[1], w[2]),
+                             np.einsum('nijk,ni,nj,nk->n', corners, w[0], slope, w[2]),
+                             np.einsum('nijk,ni,nj,nk->n', corners, w[0], w[1], slope)], axis=1)
+        outside = clamped - points
+        gap = np.linalg.norm(outside, axis=1)
+        far = gap > 0
+        distance[far] += gap[far]
+        gradient[far] = -outside[far] / gap[far, None]
+        return distance, gradient
+
+    def collide(self, position: np.ndarray, velocity: np.ndarray,
+                restitution: float = 1.0) -> NDArray[np.bool_]:
+        # Particles inside and moving deeper are put back on the surface and
+        # reflected about its normal. Updates both arrays in place, returns the hits.
+        distance, gradient = self.sample(position)
+        lengths = np.linalg.norm(gradient, axis=1, keepdims=True)
+        normal = np.divide(gradient, lengths, out=np.zeros_like(gradient), where=lengths > 0)
+        speed = np.einsum('ij,ij->i', velocity, normal)
+        hit = (distance < 0) & (speed < 0)
+        position[hit] -= (distance[hit, None] * normal[hit]).astype(position.dtype)
+        velocity[hit] -= ((1 + restitution) * speed[hit, None] * normal[hit]).astype(velocity.dtype)
+        return hit
@@ -0,0 +1,154 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+from .particles import AntiAttractor, ParticleStore, INTEGRATORS
+from .solid import Solid
+from .sdf import DistanceGrid
+
+# Every field starts on a cache line of its own
+ALIGNMENT = 64
+
+
+def field_bytes(shape: Tuple[int, ...], dtype: type) -> int:
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def split_spans(spans: Sequence[Tuple[int, int]], parts: int) -> List[List[Tuple[int, int]]]:
+    # Cuts the live rows, given as ring spans oldest first, into parts runs of
+    # nearly equal length, each again as at most two spans
+    total = sum(stop - start for start, stop in spans)
+    bounds = [total * part // parts for part in range(parts + 1)]
+    shards = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        shard = []
+        done = 0
+        for start, stop in spans:
+            first, last = max(lo, done), min(hi, done + stop - start)
+            if first < last:
+                shard.append((start + first - done, start + last - done))
+            done += stop - start
+        shards.append(shard)
+    return shards
+
+
+class SharedParticleStore(ParticleStore):
+    # ParticleStore with its arrays in one block of shared memory, so other
+    # processes step the particles in place. Given a name it attaches to the
+    # block of an existing store of the same capacity instead. Only the
+    # creating store unlinks the block on close.
+    def __init__(self, capacity: int = 1 << 16, name: str | None = None) -> None:
+        size = sum(field_bytes((capacity, width), dtype)
+                   for width, dtype in ParticleStore.FIELDS.values())
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self._offset = 0
+        super().__init__(capacity)
+
+    def _allocate(self, shape: Tuple[int, ...], dtype: type) -> np.ndarray:
+        array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=self._offset)
+        self._offset += field_bytes(shape, dtype)
+        return array
+
+    def close(self) -> None:
+        # Views into the block have to go before it can
+        self._arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _work(name: str, capacity: int, connection: Connection) -> None:
+    # Worker loop: steps the shard of rows each message names, then reports
+    # back None or the error. None instead of a message stops it.
+    store = SharedParticleStore(capacity, name=name)
+    collider = None
+    try:
+        while (message := connection.recv()) is not None:
+            try:
+                kind, args = message[0], message[1:]
+                if kind == "collider":
+                    collider = args[0]
+                else:
+                    store.head, store.count, dt, integrator, shard = args[:5]
+                    if kind == "move":
+                        for start, stop in shard:
+                            store._move_rows(slice(start, stop), collider, dt, integrator)
+                    else:
+                        forces = store.force_field(*args[5:])
+                        for start, stop in shard:
+                            store._force_rows(slice(start, stop), forces, dt, integrator)
+                connection.send(None)
+            except Exception as error:
+                connection.send(f"{type(error).__name__}: {error}")
+    finally:
+        store.close()
+
+
+class ShardedSimulation:
+    # Steps a SharedParticleStore on workers processes at once, each one a
+    # shard of the live rows. A step moves every shard, waits for all of them,
+    # since forces such as gravity read every position, then sets the new
+    # accelerations and waits again, so the store is complete when step returns.
+    def __init__(self, store: SharedParticleStore, workers: int | None = None) -> None:
+        self.store = store
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers < 1:
+            raise RuntimeError("Sharded simulation needs at least one worker")
+        self.connections: List[Connection] = []
+        self.processes: List[mp.Process] = []
+        for _ in range(self.workers):
+            connection, child = mp.Pipe()
+            process = mp.Process(target=_work, args=(store.shm.name, store.capacity, child),
+                                 daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+        # The collider the workers hold and its generation, sent again only
+        # when either changes
+        self._collider: Tuple[Any, Any] = (None, None)
+
+    def _broadcast(self, messages: Sequence[tuple]) -> None:
+        # One message per worker, then the barrier: every worker has to answer
+        for connection, message in zip(self.connections, messages):
+            connection.send(message)
+        errors = [error for error in (connection.recv() for connection in self.connections)
+                  if error is not None]
+        if errors:
+            raise RuntimeError(f"Particle worker failed: {errors[0]}")
+
+    def step(self, antiat: AntiAttractor | Sequence[AntiAttractor] | None = None,
+             collider: Solid | DistanceGrid | None = None, gravity: float = 0.0, dt: float = 1.0,
+             integrator: str = "euler") -> None:
+        # Same update as ParticleStore.step
+        if integrator not in INTEGRATORS:
+            raise RuntimeError(f"Unknown integrator {integrator}")
+        store = self.store
+        if isinstance(collider, DistanceGrid):
+            # Rebuilt here when stale, the workers' copies have no solid to check
+            collider.refresh()
+            generation = collider.generation
+        else:
+            generation = getattr(collider, "geometry_generation", None)
+        if self._collider[0] is not collider or self._collider[1] != generation:
+            self._broadcast([("collider", collider)] * self.workers)
+            self._collider = (collider, generation)
+        dt = np.float32(dt)
+        state = (store.head, store.count, dt, integrator)
+        shards = split_spans(store.spans(), self.workers)
+        self._broadcast([("move", *state, shard) for shard in shards])
+        self._broadcast([("force", *state, shard, antiat, gravity) for shard in shards])
+        store.time += float(dt)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections, self.processes = [], []
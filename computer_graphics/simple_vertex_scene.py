@@ -87,7 +87,7 @@ class LineModel(BaseModel):
 
         vertices = solid.get_cover_line()
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(vertices)
         self.vao = self.ctx.vertex_array(self.prog, [
             (self.vbo, '3f', 'aVertexPosition'),
         ])
@@ -102,9 +102,9 @@ class DumbModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_cover_triangles()
+        buffers = solid.export_buffers(["position"])
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
         self.vao = self.ctx.vertex_array(self.prog, [
             (self.vbo, '3f', 'aVertexPosition'),
         ])
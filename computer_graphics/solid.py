@@ -1,66 +1,209 @@
-from typing import Dict, Tuple, Any, List, Iterable
+from typing import Dict, Tuple, Any, List, Iterable, Callable
+import json
 import math
 import numpy as np
 import pyrr
 from numpy.typing import NDArray
 import igraph as ig
-from .revolution import Axis, create_revolution_graph
+from .revolution import Axis, create_revolution_graph, revolution_arrays
+from .topology import Topology
+from .bvh import BVH
+from . import mesh_cache
 
 
 VertexLabel = int
     
 class Solid:
     def __init__(self, graph: ig.Graph, is_polar=True, hitbox=None) -> None:
-        self.graph = graph
+        vertex_faces: List[List[Any]] = (graph.vs["faces"] if "faces" in graph.vs.attributes()
+                                         else [[] for _ in range(graph.vcount())])
+        face_labels: List[Any] = list(graph["faces"]) if "faces" in graph.attributes() else []
+        face_pos = {label: i for i, label in enumerate(face_labels)}
+        members: List[List[int]] = [[] for _ in face_labels]
+        for v_idx, faces in enumerate(vertex_faces):
+            for label in faces:
+                members[face_pos[label]].append(v_idx)
+        face_ptr = np.zeros(len(members) + 1, dtype=np.int32)
+        face_ptr[1:] = np.cumsum([len(m) for m in members])
+        face_vertices = np.fromiter((v for m in members for v in m), dtype=np.int32,
+                                    count=int(face_ptr[-1]))
+
+        coords = (graph.vs["coord"] if "coord" in graph.vs.attributes()
+                  else [(0.0, 0.0, 0.0)] * graph.vcount())
+        names = graph.vs["name"] if "name" in graph.vs.attributes() else None
+        self._init_arrays(np.array(coords, dtype=np.float64).reshape((-1, 3)),
+                          np.array(graph.get_edgelist(), dtype=np.int32).reshape((-1, 2)),
+                          face_ptr, face_vertices, face_labels, names, is_polar, hitbox)
+
+    @classmethod
+    def from_arrays(cls, coords: np.ndarray, edges: np.ndarray, face_ptr: np.ndarray,
+                    face_vertices: np.ndarray, face_labels: List[Any] | None = None,
+                    names: List[str] | None = None, is_polar=False, hitbox=None,
+                    ordered=False) -> 'Solid':
+        # ordered: face_vertices already lists every face as a cycle, so Topology
+        # does not have to walk the edges to find the loops
+        solid = cls.__new__(cls)
+        if face_labels is None:
+            face_labels = list(range(len(face_ptr) - 1))
+        solid._init_arrays(coords, edges, face_ptr, face_vertices, face_labels,
+                           names, is_polar, hitbox)
+        solid._ordered = ordered
+        return solid
+
+    def _init_arrays(self, coords: np.ndarray, edges: np.ndarray, face_ptr: np.ndarray,
+                     face_vertices: np.ndarray, face_labels: List[Any],
+                     names: List[str] | None, is_polar: bool, hitbox: 'Solid | None') -> None:
+        # (N, 3) vertex positions, read through self.coords
+        self._coords: NDArray[np.float32] = np.ascontiguousarray(coords, dtype=np.float32)
+        # Composed matrix not yet applied to _coords (lazy_transform mode)
+        self._pending: NDArray[np.float64] | None = None
+        self.lazy_transform = False
+        # (E, 2) vertex pairs
+        self.edges: NDArray[np.int32] = np.ascontiguousarray(edges, dtype=np.int32).reshape((-1, 2))
+        # CSR: vertices of face i are face_vertices[face_ptr[i]:face_ptr[i + 1]]
+        self.face_ptr: NDArray[np.int32] = np.ascontiguousarray(face_ptr, dtype=np.int32)
+        self.face_vertices: NDArray[np.int32] = np.ascontiguousarray(face_vertices, dtype=np.int32)
+        self.face_labels = face_labels
+        self._ordered = False
+        self._face_pos = {label: i for i, label in enumerate(face_labels)}
+        self.names = names
+        self._graph: ig.Graph | None = None
+        self._topology: Topology | None = None
+        self._face_flip: NDArray[np.bool_] | None = None
+        # transform() bumps the geometry generation, invalidate_topology() the topology one.
+        # Derived arrays are cached against them: name -> ((topology, geometry), value)
+        self.geometry_generation = 0
+        self.topology_generation = 0
+        self._cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        # Geometry generation the BVH boxes were last fitted to
+        self._bvh_generation = -1
         self.is_polar = is_polar
+        self.is_cube = False
         self.zero = pyrr.Vector3((0.0, 0.0, 0.0), dtype='f4')
         self.hitbox: Solid | None = hitbox
 
+    @property
+    def graph(self) -> ig.Graph:
+        # Topology view, built on demand. Coordinates live in self.coords only.
+        if self._graph is None:
+            vertex_faces: List[List[Any]] = [[] for _ in range(self.coords.shape[0])]
+            for f_pos, label in enumerate(self.face_labels):
+                for v_idx in self.face_members(f_pos):
+                    vertex_faces[v_idx].append(label)
+            names = self.names if self.names is not None else [str(i) for i in range(len(vertex_faces))]
+            self._graph = ig.Graph(n=self.coords.shape[0], edges=self.edges.tolist(),
+                                   graph_attrs={"faces": list(self.face_labels)},
+                                   vertex_attrs={"name": names, "faces": vertex_faces})
+        return self._graph
+
+    @property
+    def coords(self) -> NDArray[np.float32]:
+        if self._pending is not None:
+            self._coords = Solid.apply_matrix(self._coords, self._pending)
+            self._pending = None
+        return self._coords
+
+    @property
+    def topology(self) -> Topology:
+        # Built once; geometry changes (transform) keep it valid
+        if self._topology is None:
+            self._topology = Topology(self.coords.shape[0], self.edges,
+                                      self.face_ptr, self.face_vertices, self._ordered)
+        return self._topology
+
+    def invalidate_topology(self) -> None:
+        self._topology = None
+        self._face_flip = None
+        self._graph = None
+        self.topology_generation += 1
+
+    # For callers that write into coords in place
+    def invalidate_geometry(self) -> None:
+        self.geometry_generation += 1
+
+    def _cached(self, name: str, build: Callable[[], Any], geometry: bool = True) -> Any:
+        # Arrays come back read-only, since every caller shares them.
+        # geometry=False entries only depend on topology and survive transforms.
+        key = (self.topology_generation, self.geometry_generation if geometry else -1)
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != key:
+            value = build()
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            entry = (key, value)
+            self._cache[name] = entry
+        return entry[1]
+
+    @property
+    def face_flip(self) -> NDArray[np.bool_]:
+        # Faces whose loop must be reversed to wind counter-clockwise seen from outside.
+        # Computed once: winding is propagated over face adjacency, then each connected
+        # component is turned so that its signed volume, seen from the centre of the whole
+        # solid, is positive. For closed components the centre does not matter; open ones,
+        # such as unwelded caps, end up facing away from the rest of the solid.
+        if self._face_flip is None:
+            topology = self.topology
+            flip = topology.face_parity
+            triangles = self.coords[Solid.orient_triangles(topology.triangles,
+                                                           flip[topology.triangle_faces])]
+            components = topology.face_component[topology.triangle_faces]
+            comp_num = int(topology.face_component.max()) + 1 if topology.face_num > 0 else 0
+            center = triangles.reshape((-1, 3)).mean(axis=0, dtype=np.float64) \
+                if triangles.shape[0] > 0 else np.zeros(3)
+            rel = triangles - center
+            volumes = np.einsum('ij,ij->i', rel[:, 0], np.cross(rel[:, 1], rel[:, 2]))
+            inverted = np.bincount(components, weights=volumes, minlength=comp_num) < 0
+            self._face_flip = flip ^ inverted[topology.face_component]
+        return self._face_flip
+
+    @classmethod
+    def orient_triangles(cls, triangles: np.ndarray, flip: np.ndarray) -> np.ndarray:
+        return np.where(flip[:, None], triangles[:, [0, 2, 1]], triangles)
+
+    def face_members(self, face_pos: int) -> NDArray[np.int32]:
+        return self.face_vertices[self.face_ptr[face_pos]:self.face_ptr[face_pos + 1]]
+
     def to_coordinates(self, arr: np.ndarray[int, int]) -> np.ndarray[int, int]:
-        oarr = np.ndarray(shape=(3 * arr.shape[0],))
-        for i, idx in enumerate(arr):
-            coord = self.graph.vs[idx]["coord"]
-            for j in range(3):
-                oarr[3 * i + j] = coord[j]
-        return oarr
+        return self.coords[np.asarray(arr, dtype=np.intp)].reshape(-1)
 
+    # Accepts one (r, teta, phi) point or any (..., 3) array of them
     @classmethod
-    def cartesian_point(cls, point: pyrr.Vector3) -> pyrr.Vector3:
-        r: float = point[0]
-        teta: float = point[1]
-        phi: float = point[2]
-        return pyrr.Vector3((
-            r * math.cos(phi) * math.cos(teta),
-            r * math.cos(phi) * math.sin(teta),
-            r * math.sin(phi),
-        ))
+    def cartesian_point(cls, point: pyrr.Vector3 | np.ndarray) -> pyrr.Vector3 | np.ndarray:
+        point = np.asarray(point, dtype=np.float64)
+        r = point[..., 0]
+        teta = point[..., 1]
+        phi = point[..., 2]
+        cartesian = np.stack((
+            r * np.cos(phi) * np.cos(teta),
+            r * np.cos(phi) * np.sin(teta),
+            r * np.sin(phi),
+        ), axis=-1)
+        if cartesian.ndim == 1:
+            return pyrr.Vector3(cartesian)
+        return cartesian
     
-    def to_cartesian(self) -> 'Solid':
+    # mapping turns the (N, 3) parameter array into cartesian coordinates in one call,
+    # spherical (r, teta, phi) by default
+    def to_cartesian(self, mapping: Callable[[np.ndarray], np.ndarray] | None = None) -> 'Solid':
         if not self.is_polar:
             raise RuntimeError("Already cartesian")
 
-        new_graph = self.graph.copy()        
-        for v in new_graph.dfsiter(0):
-            v["coord"] = Solid.cartesian_point(v["coord"])
-
-        return Solid(new_graph, is_polar=False)
+        if mapping is None:
+            mapping = Solid.cartesian_point
+        coords = mapping(self.coords.astype(np.float64))
+        return Solid.from_arrays(np.reshape(coords, (-1, 3)), self.edges, self.face_ptr,
+                                 self.face_vertices, self.face_labels, self.names)
 
     # Returns 1D ndarray
     def get_cover_line_idx(self) -> np.ndarray[int, int]:
-        linegraph: ig.Graph = self.graph.linegraph()
-        tree: ig.Graph = linegraph.spanning_tree()
-        edges_idx, _ = tree.dfs(0)
-
-        line = [0] * len(edges_idx)
-        for i, e_idx in enumerate(edges_idx):
-            e = self.graph.es[e_idx]
-            line[i] = (e.source, e.target)
+        return self._cached("cover_line_idx", self._build_cover_line_idx, geometry=False)
 
-        return np.array(line).flatten()
+    def _build_cover_line_idx(self) -> np.ndarray[int, int]:
+        # Every edge once, as GL_LINES pairs
+        return self.edges.reshape(-1).copy()
     
     def get_cover_line(self) -> np.ndarray[int, int]:
-        idx_arr = self.get_cover_line_idx()
-        return self.to_coordinates(idx_arr)
+        return self._cached("cover_line", lambda: self.to_coordinates(self.get_cover_line_idx()))
     
     # Return sorted left
     @classmethod
@@ -99,63 +242,24 @@ class Solid:
 
     # Returns 1D ndarray
     def get_cover_triangles_idx(self) -> np.ndarray[int, int]:
-        triangles: List[Tuple[int, int, int]] = []
-
-        for face in self.graph["faces"]:
-            vertices = list(filter(lambda x: face in x["faces"], self.graph.vs))
-            subgraph = self.graph.induced_subgraph(vertices)
-            subpath, _ = subgraph.dfs(subgraph.vs[0].index)
-            path = []
-            for sv in subpath:
-                for v in vertices:
-                    if v["name"] == subgraph.vs[sv]["name"]:
-                        path.append(v.index)
-                        break
-            pivot = path[0]
-            for i in range(0, len(path) - 2):
-                triangles.append(
-                    (
-                        pivot,
-                        path[i + 1],
-                        path[i + 2],
-                    )
-                )
-
-        return np.array(triangles).flatten()
+        return self.topology.triangles.reshape(-1)
     
     def get_cover_triangles_tex(self) -> np.ndarray[int, int]:
-        triangles: List[Tuple[int, int, int]] = []
-
-        for face in self.graph["faces"]:
-            vertices = list(filter(lambda x: face in x["faces"], self.graph.vs))
-            subgraph = self.graph.induced_subgraph(vertices)
-            subpath, _ = subgraph.dfs(subgraph.vs[0].index)
-            # indexes = list([v.index for v in vertices])
-            path = []
-            for sv in subpath:
-                for v in vertices:
-                    if v["name"] == subgraph.vs[sv]["name"]:
-                        path.append(sv)
-                        break
-            pivot = path[0]
-            for i in range(0, len(path) - 2):
-                triangles.append(
-                    (
-                        subpath.index(pivot),
-                        subpath.index(path[i + 1]),
-                        subpath.index(path[i + 2]),
-                    )
-                )
-
-        return np.array(triangles).flatten()
+        return self.topology.tex_triangles.reshape(-1)
+
+    # Same triangles as get_cover_triangles_idx, wound counter-clockwise from outside.
+    # Keyed on geometry too: mirroring transforms flip the winding.
+    def get_oriented_triangles_idx(self) -> np.ndarray[int, int]:
+        topology = self.topology
+        return self._cached("oriented_idx", lambda: Solid.orient_triangles(
+            topology.triangles, self.face_flip[topology.triangle_faces]).reshape(-1))
 
     def get_cover_triangles(self) -> np.ndarray[int, int]:
-        idx_arr = self.get_cover_triangles_idx()
-        return self.to_coordinates(idx_arr)
+        return self._cached("cover_triangles",
+                            lambda: self.to_coordinates(self.get_cover_triangles_idx()))
     
     def get_vertices(self) -> np.ndarray[int, int]:
-        vs = np.array([v.index for v in self.graph.vs])
-        return self.to_coordinates(vs)
+        return self.coords.reshape(-1)
     
     @classmethod
     def angle(cls, x: np.array, y: np.array) -> float:
@@ -172,66 +276,301 @@ class Solid:
         angle = math.atan2(det, dot)  # atan2(y, x) or atan2(sin, cos)
         return angle
     
+    @classmethod
+    def triangle_normals(cls, triangles: np.ndarray, zero: np.ndarray) -> np.ndarray:
+        # (T, 3, 3) -> (T, 3), length is twice the triangle area
+        index = triangles[:, 2] - triangles[:, 1]
+        mid = triangles[:, 1] - triangles[:, 0]
+        normals = np.cross(index, mid)
+        # le costile begin: angle to the centre vector above pi / 2 means inwards
+        center = triangles.mean(axis=1) - np.asarray(zero, dtype=triangles.dtype)
+        flip = np.einsum('ij,ij->i', normals, center) < 0
+        normals[flip] = -normals[flip]
+        # le costile end
+        return normals
+
+    @classmethod
+    def cross_normals(cls, triangles: np.ndarray) -> np.ndarray:
+        # (T, 3, 3) counter-clockwise triangles -> (T, 3), length is twice the area
+        return np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+
     def get_normal(self, points: np.ndarray) -> np.ndarray:
         if points.shape != (3, 3):
             raise RuntimeError(f"Invalid shape {points.shape}")
-        
-        index: np.ndarray = np.subtract(points[2], points[1])
-        mid: np.ndarray = np.subtract(points[1], points[0])
-        normal_vec = np.cross(index, mid)
-        # le costile begin
-        center_vec = np.average(points, axis=0) - self.zero
-        if Solid.angle(normal_vec, center_vec) > (math.pi / 2):
-            normal_vec = - normal_vec
-        # le costile end
-        return normal_vec
+        return Solid.triangle_normals(points[None, :, :], self.zero)[0]
     
     def get_normales(self) -> np.ndarray[int, int]:
-        triangles = self.get_cover_triangles()
-        triangles = triangles.reshape((triangles.shape[0] // (3 * 3), 3, 3))
-        normales = [0] * triangles.shape[0]
-        for i, triangle in enumerate(triangles):
-            normal_vec = self.get_normal(triangle)
-            normales[i] = normal_vec
-        return np.array(normales).flatten()
+        return self._cached("normales", lambda: Solid.cross_normals(
+            self.coords[self.get_oriented_triangles_idx().reshape((-1, 3))]).reshape(-1))
     
     def get_normales_repeated(self) -> np.ndarray[int, int]:
-        normales = self.get_normales()
-        normales = normales.reshape((normales.shape[0] // 3, 3))
-        normales = np.repeat(normales, repeats=3, axis=0)
-        return normales.flatten()
-    
+        normales = self.get_normales().reshape((-1, 3))
+        return self._cached("normales_repeated",
+                            lambda: np.repeat(normales, repeats=3, axis=0).reshape(-1))
+
+    # Area-weighted vertex normals, (N, 3) flattened. Whole faces are weighted,
+    # so the result does not depend on how a face was split into triangles.
+    def get_vertex_normales(self) -> np.ndarray[int, int]:
+        return self._cached("vertex_normales", self._build_vertex_normales)
+
+    def _build_vertex_normales(self) -> np.ndarray[int, int]:
+        topology = self.topology
+        triangle_normals = self.get_normales().reshape((-1, 3))
+        loop_faces = np.repeat(np.arange(topology.face_num), np.diff(topology.loop_ptr))
+        normals = np.zeros((self.coords.shape[0], 3), dtype=np.float32)
+        for axis in range(3):
+            face_normals = np.bincount(topology.triangle_faces, weights=triangle_normals[:, axis],
+                                       minlength=topology.face_num)
+            normals[:, axis] = np.bincount(topology.loop_vertices, weights=face_normals[loop_faces],
+                                           minlength=normals.shape[0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        np.divide(normals, lengths, out=normals, where=lengths > 0)
+        return normals.reshape(-1)
+
+    def get_smooth_normales_repeated(self) -> np.ndarray[int, int]:
+        normals = self.get_vertex_normales().reshape((-1, 3))
+        return self._cached("smooth_normales_repeated",
+                            lambda: normals[self.topology.triangles.reshape(-1)].reshape(-1))
+
+    BUFFER_DTYPES: Dict[str, str] = {
+        "position": 'f4',
+        "normal": 'f4',
+        "smooth_normal": 'f4',
+        "texindex": 'u4',
+        "vertex": 'f4',
+        "vertex_normal": 'f4',
+        "index": 'u4',
+        "oriented_index": 'u4',
+        "line_index": 'u4',
+    }
+
+    def export_buffers(self, layout: Iterable[str]) -> Dict[str, np.ndarray]:
+        # Returned arrays are C-contiguous float32/uint32 and expose the buffer
+        # protocol, so ctx.buffer() and Buffer.write() take them without tobytes().
+        # "position", "normal" and "texindex" describe an unindexed triangle list,
+        # "vertex" with "index" or "line_index" an indexed one. The smooth_normal and
+        # vertex_normal variants carry area-weighted per-vertex normals.
+        exporters: Dict[str, Callable[[], np.ndarray]] = {
+            "position": lambda: self.get_cover_triangles().reshape((-1, 3)),
+            "normal": lambda: self.get_normales_repeated().reshape((-1, 3)),
+            "smooth_normal": lambda: self.get_smooth_normales_repeated().reshape((-1, 3)),
+            "texindex": self.get_cover_triangles_tex,
+            "vertex": lambda: self.coords,
+            "vertex_normal": lambda: self.get_vertex_normales().reshape((-1, 3)),
+            "index": self.get_cover_triangles_idx,
+            "oriented_index": self.get_oriented_triangles_idx,
+            "line_index": self.get_cover_line_idx,
+        }
+        buffers = {}
+        for name in layout:
+            if name not in exporters:
+                raise RuntimeError(f"Unknown buffer {name}")
+            buffers[name] = np.ascontiguousarray(exporters[name](), dtype=Solid.BUFFER_DTYPES[name])
+        return buffers
+
     def get_common_edge(self, lface_idx: int, rface_idx: int) -> Tuple[int, int]:
-        f = lambda v: (lface_idx in v["faces"]) and (rface_idx in v["faces"])
-        vertices = filter(f, self.graph.vs)
-        return tuple(v.index for v in vertices)
+        lvertices = self.face_members(self._face_pos[lface_idx])
+        rvertices = self.face_members(self._face_pos[rface_idx])
+        return tuple(int(v) for v in np.intersect1d(lvertices, rvertices))
     
+    # Everything needed to rebuild this solid without regenerating it, see cached_solid
+    def cache_arrays(self) -> Dict[str, np.ndarray]:
+        topology = self.topology
+        meta = {
+            "face_labels": list(self.face_labels),
+            "names": self.names,
+            "is_polar": self.is_polar,
+            "is_cube": self.is_cube,
+        }
+        return {
+            "meta": np.array(json.dumps(meta)),
+            "coords": self.coords,
+            "edges": self.edges,
+            "loop_ptr": topology.loop_ptr,
+            "loop_vertices": topology.loop_vertices,
+            "face_flip": self.face_flip,
+            "position": self.get_cover_triangles(),
+            "oriented_index": self.get_oriented_triangles_idx(),
+            "normal": self.get_normales(),
+        }
+
+    @classmethod
+    def from_cache_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'Solid':
+        meta = json.loads(str(arrays["meta"]))
+        solid = cls.from_arrays(arrays["coords"], arrays["edges"], arrays["loop_ptr"],
+                                arrays["loop_vertices"], meta["face_labels"], meta["names"],
+                                meta["is_polar"], ordered=True)
+        solid.is_cube = meta["is_cube"]
+        solid._face_flip = arrays["face_flip"]
+        solid._cached("cover_triangles", lambda: arrays["position"])
+        solid._cached("oriented_idx", lambda: arrays["oriented_index"])
+        solid._cached("normales", lambda: arrays["normal"])
+        return solid
+
+    # A copy, callers are free to modify it
     def get_face_normal(self, face_idx: int) -> pyrr.Vector3:
-        f = lambda v: face_idx in v["faces"]
-        vertices = list(filter(f, self.graph.vs))
-        coords = self.to_coordinates(np.array([v.index for v in vertices[0:3]])).reshape((3, 3))
-        return self.get_normal(coords)
+        return self.get_face_normals()[self._face_pos[face_idx]].copy()
+
+    # (F, 3) normal of the first oriented triangle of every face loop
+    def get_face_normals(self) -> NDArray[np.float32]:
+        return self._cached("face_normals", self._build_face_normals)
+
+    def _build_face_normals(self) -> NDArray[np.float32]:
+        topology = self.topology
+        if topology.loop_vertices.shape[0] == 0:
+            return np.zeros((topology.face_num, 3), dtype=np.float32)
+        first = np.minimum(topology.loop_ptr[:-1, None] + np.arange(3),
+                           topology.loop_vertices.shape[0] - 1)
+        loops = Solid.orient_triangles(topology.loop_vertices[first], self.face_flip)
+        return Solid.cross_normals(self.coords[loops])
     
+    @classmethod
+    def apply_matrix(cls, points: np.ndarray, matrix: np.ndarray) -> NDArray[np.float32]:
+        # Row vectors, as pyrr does: p' = (p, 1) . M
+        matrix = np.asarray(matrix, dtype=np.float64)
+        points = np.asarray(points, dtype=np.float64)
+        result = points @ matrix[:3, :3] + matrix[3, :3]
+        if not np.array_equal(matrix[:, 3], (0.0, 0.0, 0.0, 1.0)):
+            result /= (points @ matrix[:3, 3] + matrix[3, 3])[:, None]
+        return np.ascontiguousarray(result, dtype=np.float32)
+
     def transform(self, matrix: pyrr.Matrix44) -> None:
-        for v in self.graph.vs:
-            v["coord"] = matrix * v["coord"]
-        self.zero = matrix * self.zero
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if self._pending is not None:
+            self._pending = self._pending @ matrix
+        elif self.lazy_transform:
+            self._pending = matrix
+        else:
+            self._coords = Solid.apply_matrix(self._coords, matrix)
+        self.geometry_generation += 1
+        if self._face_flip is not None and np.linalg.det(matrix[:3, :3]) < 0:
+            # Mirroring turns outward winding inside out
+            self._face_flip = ~self._face_flip
+        self.zero = pyrr.Vector3(Solid.apply_matrix(self.zero[None, :], matrix)[0])
         if self.hitbox is not None:
             self.hitbox.transform(matrix)
         return
     
+    # (F, 4) outward unit normal and offset of every face plane: n . x <= d inside
+    def get_face_planes(self) -> NDArray[np.float32]:
+        return self._cached("face_planes", self._build_face_planes)
+
+    def _build_face_planes(self) -> NDArray[np.float32]:
+        topology = self.topology
+        triangle_normals = self.get_normales().reshape((-1, 3))
+        loop_faces = np.repeat(np.arange(topology.face_num), np.diff(topology.loop_ptr))
+        sizes = np.maximum(np.diff(topology.loop_ptr), 1)
+        loop_coords = self.coords[topology.loop_vertices]
+        planes = np.zeros((topology.face_num, 4), dtype=np.float64)
+        for axis in range(3):
+            planes[:, axis] = np.bincount(topology.triangle_faces, weights=triangle_normals[:, axis],
+                                          minlength=topology.face_num)
+        lengths = np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+        np.divide(planes[:, :3], lengths, out=planes[:, :3], where=lengths > 0)
+        centers = np.stack([np.bincount(loop_faces, weights=loop_coords[:, axis],
+                                        minlength=topology.face_num) / sizes
+                            for axis in range(3)], axis=1)
+        planes[:, 3] = np.einsum('ij,ij->i', planes[:, :3], centers)
+        return planes.astype(np.float32)
+
+    # (F, 3) average of the members of every face
+    def get_face_centroids(self) -> NDArray[np.float32]:
+        return self._cached("face_centroids", self._build_face_centroids)
+
+    def _build_face_centroids(self) -> NDArray[np.float32]:
+        faces = np.repeat(np.arange(len(self.face_labels)), np.diff(self.face_ptr))
+        sizes = np.maximum(np.diff(self.face_ptr), 1)
+        member_coords = self.coords[self.face_vertices].astype(np.float64)
+        return np.stack([np.bincount(faces, weights=member_coords[:, axis],
+                                     minlength=len(self.face_labels)) / sizes
+                         for axis in range(3)], axis=1).astype(np.float32)
+
+    # Only exact for convex solids: a point is inside when it is behind every face plane
+    def contains_many(self, points: np.ndarray) -> NDArray[np.bool_]:
+        planes = self.get_face_planes()
+        points = np.asarray(points, dtype=np.float32).reshape((-1, 3))
+        scale = float(np.abs(planes[:, 3]).max()) if planes.shape[0] > 0 else 1.0
+        tolerance = 1e-6 * max(scale, 1.0)
+        inside = np.empty(points.shape[0], dtype=np.bool_)
+        # Chunks keep the (points, faces) distance block small for large particle counts
+        chunk = max(1, (1 << 20) // max(planes.shape[0], 1))
+        for start in range(0, points.shape[0], chunk):
+            distances = points[start:start + chunk] @ planes[:, :3].T - planes[:, 3]
+            inside[start:start + chunk] = np.all(distances <= tolerance, axis=1)
+        return inside
+
     def is_in(self, point: pyrr.Vector3) -> bool:
-        if not self.is_cube:
-            raise RuntimeError("Not a cube")
-        distances = []
-        for v in self.graph.vs:
-            coord = v["coord"]
-            distances.append(np.linalg.norm(point - coord))
-        diag = 2 * np.linalg.norm(self.graph.vs[0]["coord"] - self.zero)
-        return all(dist < diag for dist in distances)
+        return bool(self.contains_many(np.asarray(point))[0])
+
+    # Triangle indices of the BVH are rows of get_cover_triangles_idx().reshape((-1, 3)).
+    # Built once per topology, transforms only refit the boxes.
+    def get_bvh(self) -> BVH:
+        bvh = self._cached("bvh", self._build_bvh, geometry=False)
+        if self._bvh_generation != self.geometry_generation:
+            bvh.refit(self.coords)
+            self._bvh_generation = self.geometry_generation
+        return bvh
+
+    def _build_bvh(self) -> BVH:
+        self._bvh_generation = self.geometry_generation
+        return BVH(self.coords, self.topology.triangles)
+
+    # Nearest face hit by every ray: (R,) t, inf on a miss, and (R,) face position, -1 on a miss
+    def pick_faces(self, origins: np.ndarray,
+                   directions: np.ndarray) -> Tuple[NDArray[np.float64], NDArray[np.int32]]:
+        t, triangles = self.get_bvh().ray_cast(origins, directions)
+        faces = np.where(triangles >= 0, self.topology.triangle_faces[triangles], -1)
+        return t, faces.astype(np.int32)
             
 
+# Loads the solid from the on-disk mesh cache, or builds and stores it. params must
+# describe everything build depends on; the generating code is part of the key.
+def cached_solid(name: str, build: Callable[[], Solid], **params: Any) -> Solid:
+    # Without a cache the derived arrays would only be thrown away
+    if mesh_cache.cache_dir() is None:
+        return build()
+    key = mesh_cache.mesh_key(name, **params)
+    arrays = mesh_cache.load(key)
+    if arrays is not None:
+        try:
+            return Solid.from_cache_arrays(arrays)
+        except (KeyError, ValueError, TypeError, IndexError, RuntimeError):
+            # A readable archive with missing or mismatched members: regenerate
+            pass
+    solid = build()
+    mesh_cache.store(key, solid.cache_arrays())
+    return solid
+
+CONE_PROFILE = [
+    pyrr.Vector3((0.0, 1.0, 0.0)),
+    pyrr.Vector3((1.0, 0.0, 0.0)),
+]
+
+CILINDER_PROFILE = [
+    pyrr.Vector3((1.0, 1.0, 0.0)),
+    pyrr.Vector3((1.0, 0.0, 0.0)),
+]
+
 def createDodecahedron() -> Solid:
+    return cached_solid("dodecahedron", buildDodecahedron)
+
+def createCube() -> Solid:
+    return cached_solid("cube", buildCube)
+
+def createTetrahedron() -> Solid:
+    return cached_solid("tetrahedron", buildTetrahedron)
+
+def createCone(pieces: int = 360, weld: bool = True) -> Solid:
+    return cached_solid("cone", lambda: buildCone(pieces, weld),
+                        profile=CONE_PROFILE, axis=Axis.Y, pieces=pieces, weld=weld)
+
+def createCilinder(pieces: int = 360, weld: bool = True) -> Solid:
+    solid = cached_solid("cilinder", lambda: buildCilinder(pieces, weld),
+                         profile=CILINDER_PROFILE, axis=Axis.Y, pieces=pieces, weld=weld)
+    solid.hitbox = createCube()
+    return solid
+
+def buildDodecahedron() -> Solid:
     graph = ig.Graph(graph_attrs={
         "faces": [
             0,
@@ -355,7 +694,7 @@ def createDodecahedron() -> Solid:
 
     return Solid(graph).to_cartesian()
 
-def createCube() -> Solid:
+def buildCube() -> Solid:
     graph = ig.Graph(graph_attrs={
         "faces": [
             0,
@@ -422,7 +761,7 @@ def createCube() -> Solid:
     solid.is_cube = True
     return solid 
 
-def createTetrahedron() -> Solid:
+def buildTetrahedron() -> Solid:
     graph = ig.Graph(graph_attrs={
         "faces": [
             0,
@@ -465,46 +804,14 @@ def createTetrahedron() -> Solid:
 
     return Solid(graph).to_cartesian()
 
-def createCone() -> Solid:
-    line = [
-        pyrr.Vector3((0.0, 1.0, 0.0)),
-        pyrr.Vector3((1.0, 0.0, 0.0)),
-    ]
-    graph = create_revolution_graph(line, axis=Axis.Y)
-    new_idx = [0] * graph["pieces"] + [i + 1 for i in range(graph["pieces"])]
-    
-    attr_num = 0
-    def combinator(values: List[Any]) -> List[Any]:
-        nonlocal attr_num
-        if len(values) == 1:
-            return values[0]
-        if attr_num == 1: # faces
-            faces = set()
-            for farr in values:
-                subset = set(farr)
-                faces |= subset
-            values = list(faces)
-        else:
-            values = values[0]
-        attr_num += 1
-        return values
-
-    graph.contract_vertices(new_idx, combine_attrs=combinator)
-    
-    del_edges = []
-    for e in graph.es:
-        if e.source == e.target:
-            del_edges.append(e.index)
-    graph.delete_edges(del_edges)
-    
-    return Solid(graph, is_polar=False)
-
-def createCilinder() -> Solid:
-    line = [
-        pyrr.Vector3((1.0, 1.0, 0.0)),
-        pyrr.Vector3((1.0, 0.0, 0.0)),
-    ]
-    graph = create_revolution_graph(line, axis=Axis.Y)
-    new_idx = [0] * graph["pieces"] + [i + 1 for i in range(graph["pieces"])]
+# Closed: the apex is a single vertex and the base is capped
+def buildCone(pieces: int = 360, weld: bool = True) -> Solid:
+    coords, edges, face_ptr, face_vertices, labels = revolution_arrays(CONE_PROFILE, Axis.Y, pieces,
+                                                                       caps=True, weld=weld)
+    return Solid.from_arrays(coords, edges, face_ptr, face_vertices, labels, ordered=True)
 
-    return Solid(graph, is_polar=False, hitbox=createCube())
\ No newline at end of file
+# Closed: both ends are capped
+def buildCilinder(pieces: int = 360, weld: bool = True) -> Solid:
+    coords, edges, face_ptr, face_vertices, labels = revolution_arrays(CILINDER_PROFILE, Axis.Y, pieces,
+                                                                       caps=True, weld=weld)
+    return Solid.from_arrays(coords, edges, face_ptr, face_vertices, labels, ordered=True)
@@ -0,0 +1,162 @@
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .forces import accumulate, expand_ranges
+
+# Teschner et al., "Optimized Spatial Hashing for Collision Detection of Deformable Objects"
+HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.int64)
+# Candidate rows handled at once
+CHUNK = 1 << 21
+# Bits per axis of a packed cell id. Ids wrap, so cells 2**CELL_BITS apart
+# share one; the distance test tells their points apart.
+CELL_BITS = 21
+CELL_MASK = (1 << CELL_BITS) - 1
+# Bits of key sorted per counting pass
+DIGIT_BITS = 16
+# The own cell and the 13 cells after it in (x, y, z) order, the middle and
+# second half of the 3x3x3 block. A pair of neighbouring cells is met from
+# exactly one of its two cells.
+FORWARD = (np.array(list(np.ndindex(3, 3, 3))) - 1)[13:]
+
+
+def counting_order(keys: np.ndarray, size: int) -> NDArray[np.int64]:
+    # Stable order of keys in [0, size): least significant digit first, one
+    # counting sort per 16-bit digit, which is what numpy's stable argsort runs
+    # on uint16. Linear in the keys, unlike a comparison sort of int64.
+    order = np.arange(keys.shape[0])
+    shift = 0
+    while shift == 0 or 1 << shift < size:
+        digit = ((keys[order] >> shift) & ((1 << DIGIT_BITS) - 1)).astype(np.uint16)
+        order = order[np.argsort(digit, kind='stable')]
+        shift += DIGIT_BITS
+    return order
+
+
+class SpatialHash:
+    # Points bucketed by the cubic cell of side cell they fall in. Cells hash into
+    # a table of about twice as many buckets as points; bincount and its prefix
+    # sum give every bucket a contiguous run of the sorted points, as in a
+    # counting sort. Rebuilt from scratch every tick in linear time.
+    def __init__(self, points: np.ndarray, cell: float) -> None:
+        if cell <= 0:
+            raise RuntimeError("Spatial hash needs a positive cell size")
+        self.points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        self.cell = cell
+        self.table_size = 1 << max(int(np.ceil(np.log2(max(2 * self.points.shape[0], 1)))), 4)
+        self.cells = np.floor(self.points / cell).astype(np.int64)
+        keys = self.hash(self.cells)
+        self.count = np.bincount(keys, minlength=self.table_size)
+        self.start = np.cumsum(self.count) - self.count
+        # Stable, so each bucket keeps its points in index order
+        self.order = counting_order(keys, self.table_size)
+        # Cell ids, telling apart nearly all the cells that share a bucket
+        self.ids = self.pack(self.cells)
+
+    def hash(self, cells: np.ndarray) -> NDArray[np.int64]:
+        mixed = cells * HASH_PRIMES
+        return (mixed[..., 0] ^ mixed[..., 1] ^ mixed[..., 2]) % self.table_size
+
+    def pack(self, cells: np.ndarray) -> NDArray[np.int64]:
+        wrapped = cells & CELL_MASK
+        return (wrapped[..., 0] << 2 * CELL_BITS) | (wrapped[..., 1] << CELL_BITS) | wrapped[..., 2]
+
+    def pairs(self, radius: float) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        # Every (i, j), i < j, of points at most radius apart; radius <= cell.
+        # Works on runs of one cell in bucket order: each run looks up its own
+        # and the forward cells once, then pairs its points with theirs.
+        if radius > self.cell:
+            raise RuntimeError("Neighbour radius exceeds the spatial hash cell")
+        n = self.points.shape[0]
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # Axis by axis, gathering from columns beats gathering rows
+        columns = np.ascontiguousarray(self.points[self.order].T)
+        ids = self.ids[self.order]
+        # Runs split on the whole cell, cells with one id may share a bucket
+        sorted_cells = self.cells[self.order]
+        first = np.flatnonzero(np.r_[True, np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)])
+        stop = np.r_[first[1:], n]
+        cells = sorted_cells[first]
+
+        width = FORWARD.shape[0]
+
+        def lookup(runs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            neighbours = cells[runs, None, :] + FORWARD
+            return self.pack(neighbours).reshape(-1), self.hash(neighbours).reshape(-1)
+
+        # Runs go in chunks of about CHUNK candidate pairs, a run costing its
+        # points times the points in its buckets
+        work = np.zeros(first.shape[0], dtype=np.int64)
+        for begin in range(0, first.shape[0], CHUNK // width):
+            runs = np.arange(begin, min(begin + CHUNK // width, first.shape[0]))
+            counts = self.count[lookup(runs)[1]].reshape((-1, width))
+            work[runs] = (stop - first)[runs] * counts.sum(axis=1)
+        done = np.cumsum(work)
+        cuts = np.unique(np.searchsorted(done, np.arange(CHUNK, done[-1], CHUNK), side='right'))
+        found_i, found_j = [], []
+        for runs in np.split(np.arange(first.shape[0]), cuts):
+            if runs.shape[0] == 0:
+                continue
+            wanted, buckets = lookup(runs)
+            pick, slots = expand_ranges(self.start[buckets],
+                                        self.start[buckets] + self.count[buckets])
+            # Buckets are shared by colliding cells, keep the cell that was asked for
+            keep = ids[slots] == wanted[pick]
+            pick, slots = pick[keep], slots[keep]
+            run = runs[pick // width]
+            own = pick % width == 0
+            owner, a = expand_ranges(first[run], stop[run])
+            b = slots[owner]
+            # Within the own cell each pair once
+            keep = ~own[owner] | (a < b)
+            a, b = a[keep], b[keep]
+            distance2 = np.zeros(a.shape[0])
+            for column in columns:
+                away = column[a] - column[b]
+                distance2 += away * away
+            close = distance2 <= radius * radius
+            i, j = self.order[a[close]], self.order[b[close]]
+            found_i.append(np.minimum(i, j))
+            found_j.append(np.maximum(i, j))
+        return np.concatenate(found_i), np.concatenate(found_j)
+
+    def density(self, radius: float) -> NDArray[np.float64]:
+        # Poly6 kernel sum over the neighbours within radius, the point included
+        i, j = self.pairs(radius)
+        away = self.points[i] - self.points[j]
+        weight = (radius * radius - np.einsum('ij,ij->i', away, away)) ** 3
+        scale = 315 / (64 * np.pi * radius ** 9)
+        density = np.full(self.points.shape[0], radius ** 6)
+        density += np.bincount(i, weights=weight, minlength=density.shape[0])
+        density += np.bincount(j, weights=weight, minlength=density.shape[0])
+        return scale * density
+
+    def separation(self, radius: float, strength: float) -> NDArray[np.float64]:
+        # Pushes every pair within radius apart, strength at contact fading to 0 at radius
+        i, j = self.pairs(radius)
+        away = self.points[i] - self.points[j]
+        distance = np.linalg.norm(away, axis=1)
+        push = np.divide(strength * (1 - distance / radius), distance,
+                         out=np.zeros_like(distance), where=distance > 0)[:, None] * away
+        result = np.zeros_like(self.points)
+        accumulate(result, i, push)
+        accumulate(result, j, -push)
+        return result
+
+    def collide(self, velocity: np.ndarray, radius: float,
+                restitution: float = 1.0) -> NDArray[np.float64]:
+        # Velocity change of equal-mass spheres of diameter radius bouncing off
+        # each other: approaching pairs swap restitution of their normal speed.
+        # A particle touching several others sums the impulses.
+        velocity = np.asarray(velocity, dtype=np.float64).reshape((-1, 3))
+        i, j = self.pairs(radius)
+        away = self.points[i] - self.points[j]
+        distance = np.linalg.norm(away, axis=1, keepdims=True)
+        normal = np.divide(away, distance, out=np.zeros_like(away), where=distance > 0)
+        closing = np.einsum('ij,ij->i', velocity[i] - velocity[j], normal)
+        approaching = closing < 0
+        impulse = -(1 + restitution) / 2 * (closing * approaching)[:, None] * normal
+        result = np.zeros_like(velocity)
+        accumulate(result, i, impulse)
+        accumulate(result, j, -impulse)
+        return result
@@ -0,0 +1,63 @@
+from typing import List, Sequence
+import numpy as np
+import moderngl as mgl
+
+
+class StreamingBuffer:
+    # Vertex data rewritten every frame. Storage grows geometrically, and a write
+    # never waits on draws still reading the last frame: with one copy the
+    # storage is orphaned before writing, with more the copies take turns.
+    def __init__(self, ctx: mgl.Context, program: mgl.Program, layout: str,
+                 attributes: Sequence[str], stride: int, capacity: int = 1024,
+                 copies: int = 1) -> None:
+        if copies < 1:
+            raise RuntimeError("Streaming buffer needs at least one copy")
+        self.ctx = ctx
+        self.program = program
+        self.layout = layout
+        self.attributes = tuple(attributes)
+        self.stride = stride
+        self.copies = copies
+        self.current = 0
+        self.rows = 0
+        self.buffers: List[mgl.Buffer] = []
+        self.vaos: List[mgl.VertexArray] = []
+        self._allocate(max(capacity, 1) * stride)
+
+    @property
+    def size(self) -> int:
+        return self.buffers[0].size
+
+    @property
+    def buffer(self) -> mgl.Buffer:
+        return self.buffers[self.current]
+
+    def _allocate(self, size: int) -> None:
+        for vao in self.vaos:
+            vao.release()
+        for buffer in self.buffers:
+            buffer.release()
+        self.buffers = [self.ctx.buffer(reserve=size, dynamic=True) for _ in range(self.copies)]
+        self.vaos = [self.ctx.vertex_array(self.program, [(buffer, self.layout, *self.attributes)])
+                     for buffer in self.buffers]
+
+    def write(self, parts: Sequence[np.ndarray]) -> int:
+        # Writes the parts back to back straight from their arrays, returns the rows
+        rows = sum(part.shape[0] for part in parts)
+        if rows * self.stride > self.size:
+            self._allocate(max(rows * self.stride, 2 * self.size))
+        if self.copies > 1:
+            self.current = (self.current + 1) % self.copies
+        else:
+            self.buffer.orphan()
+        offset = 0
+        for part in parts:
+            if part.shape[0] > 0:
+                self.buffer.write(np.ascontiguousarray(part), offset=offset)
+                offset += part.shape[0] * self.stride
+        self.rows = rows
+        return rows
+
+    def render(self, mode: int = mgl.POINTS) -> None:
+        if self.rows > 0:
+            self.vaos[self.current].render(mode=mode, vertices=self.rows)
@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .bvh import BVH, closest_points_on_triangles
+from .solid import createCube, createCilinder
+
+def brute_ray_cast(corners: np.ndarray, origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    nearest = np.full(origins.shape[0], np.inf)
+    e1 = corners[:, 1] - corners[:, 0]
+    e2 = corners[:, 2] - corners[:, 0]
+    for r, (o, d) in enumerate(zip(origins, directions)):
+        p = np.cross(d, e2)
+        det = np.einsum('ij,ij->i', e1, p)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = o - corners[:, 0]
+            u = np.einsum('ij,ij->i', s, p) / det
+            q = np.cross(s, e1)
+            v = q @ d / det
+            t = np.einsum('ij,ij->i', e2, q) / det
+        hit = (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+        if np.any(hit):
+            nearest[r] = t[hit].min()
+    return nearest
+
+class TestRayCast(unittest.TestCase):
+    def test_cube(self):
+        solid = createCube()
+        half = 1 / np.sqrt(3)
+        origins = np.array([(0.0, 0.0, 5.0), (0.2, -0.1, 5.0), (3.0, 3.0, 5.0)])
+        directions = np.array([(0.0, 0.0, -1.0)] * 3)
+        t, faces = solid.pick_faces(origins, directions)
+        npt.assert_allclose(t[:2], 5.0 - half, rtol=1e-5)
+        self.assertEqual(t[2], np.inf)
+        self.assertEqual(faces[0], faces[1])
+        self.assertEqual(faces[2], -1)
+
+    def test_matches_brute_force(self):
+        solid = createCilinder()
+        corners = solid.coords[solid.topology.triangles].astype(np.float64)
+        rng = np.random.default_rng(2)
+        origins = rng.uniform(-2.0, 2.0, size=(200, 3))
+        directions = rng.normal(size=(200, 3))
+        t, triangles = solid.get_bvh().ray_cast(origins, directions)
+        npt.assert_allclose(t, brute_ray_cast(corners, origins, directions), rtol=1e-9)
+        self.assertTrue(np.all((triangles >= 0) == np.isfinite(t)))
+
+    def test_segments(self):
+        bvh = createCube().get_bvh()
+        starts = np.array([(0.0, 0.0, 5.0), (0.0, 0.0, 5.0)])
+        ends = np.array([(0.0, 0.0, 1.0), (0.0, 0.0, 0.0)])
+        t, _ = bvh.intersect_segments(starts, ends)
+        self.assertEqual(t[0], np.inf)
+        npt.assert_allclose(t[1], (5.0 - 1 / np.sqrt(3)) / 5.0, rtol=1e-5)
+        npt.assert_array_equal(bvh.count_intersections(starts, ends - starts), [2, 2])
+
+class TestClosestPoints(unittest.TestCase):
+    def test_matches_brute_force(self):
+        solid = createCilinder()
+        corners = solid.coords[solid.topology.triangles].astype(np.float64)
+        rng = np.random.default_rng(3)
+        points = rng.uniform(-2.0, 2.0, size=(100, 3))
+        distance, closest, triangles = solid.get_bvh().closest_points(points)
+        for point, d in zip(points, distance):
+            repeated = np.repeat(point[None, :], corners.shape[0], axis=0)
+            exact = closest_points_on_triangles(repeated, corners[:, 0], corners[:, 1], corners[:, 2])
+            npt.assert_allclose(d, np.linalg.norm(exact - point, axis=1).min(), rtol=1e-9)
+        npt.assert_allclose(np.linalg.norm(closest - points, axis=1), distance, rtol=1e-9)
+
+    def test_max_distance(self):
+        bvh = createCube().get_bvh()
+        distance, closest, triangles = bvh.closest_points(np.array([(0.0, 0.0, 0.0),
+                                                                    (0.0, 0.0, 3.0)]), 1.0)
+        npt.assert_allclose(distance[0], 1 / np.sqrt(3), rtol=1e-5)
+        self.assertEqual(distance[1], np.inf)
+        self.assertEqual(triangles[1], -1)
+
+class TestRefit(unittest.TestCase):
+    def test_transform(self):
+        solid = createCilinder()
+        bvh = solid.get_bvh()
+        solid.transform(pyrr.Matrix44.from_x_rotation(0.7, dtype='f4'))
+        solid.transform(pyrr.Matrix44.from_translation(np.array([0.5, 2.0, 0.0]), dtype='f4'))
+        self.assertIs(solid.get_bvh(), bvh)
+
+        fresh = BVH(solid.coords, solid.topology.triangles)
+        rng = np.random.default_rng(4)
+        origins = rng.uniform(-2.0, 3.0, size=(200, 3))
+        directions = rng.normal(size=(200, 3))
+        npt.assert_allclose(bvh.ray_cast(origins, directions)[0],
+                            fresh.ray_cast(origins, directions)[0])
+        npt.assert_allclose(bvh.closest_points(origins)[0], fresh.closest_points(origins)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .emitter import Emitter, EmitterTable
+from .solid import createCube
+
+class TestEmitterTable(unittest.TestCase):
+    def setUp(self):
+        # x faces are a third of the area of the others
+        self.cube = createCube()
+        self.cube.transform(pyrr.Matrix44.from_scale(np.array([3.0, 1.0, 1.0]), dtype='f4'))
+        self.half = self.cube.coords.max(axis=0)
+
+    def test_area_weights(self):
+        positions, normals = EmitterTable(self.cube).sample(60000, np.random.default_rng(6))
+        npt.assert_allclose(np.linalg.norm(normals, axis=1), 1.0, rtol=1e-6)
+        # Centroids sit on their face, a small step along the normal leaves the cube
+        self.assertFalse(self.cube.contains_many(positions + normals * 0.01).any())
+        x_share = np.mean(np.abs(normals[:, 0]) > 0.5)
+        self.assertAlmostEqual(x_share, 2 / 14, delta=0.01)
+
+    def test_scatter(self):
+        positions, normals = EmitterTable(self.cube).sample(5000, np.random.default_rng(7), scatter=True)
+        self.assertTrue(np.all(np.abs(positions) <= self.half + 1e-5))
+        # Every point lies on the face its normal belongs to
+        axis = np.argmax(np.abs(normals), axis=1)
+        on_face = positions[np.arange(5000), axis] * np.sign(normals[np.arange(5000), axis])
+        npt.assert_allclose(on_face, self.half[axis], rtol=1e-5)
+        self.assertGreater(np.unique(positions.round(3), axis=0).shape[0], 4000)
+
+class TestEmitter(unittest.TestCase):
+    def test_rate(self):
+        emitter = Emitter(createCube(), speed=0.5, rate=2.5)
+        self.assertEqual([emitter.due() for _ in range(4)], [2, 3, 2, 3])
+        positions, velocities = emitter.emit(16)
+        self.assertEqual(positions.shape, (16, 3))
+        npt.assert_allclose(np.linalg.norm(velocities, axis=1), 0.5, rtol=1e-6)
+
+    def test_rebuild(self):
+        cube = createCube()
+        emitter = Emitter(cube, speed=1.0)
+        table = emitter.table
+        self.assertIs(emitter.table, table)
+        cube.transform(pyrr.Matrix44.from_translation(np.array([10.0, 0.0, 0.0]), dtype='f4'))
+        positions, _ = emitter.emit(8)
+        self.assertIsNot(emitter.table, table)
+        self.assertTrue(np.all(positions[:, 0] > 9.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .forces import EXACT_LIMIT, ForceField, Octree, exact_field
+from .particles import AntiAttractor, ParticleStore
+
+class TestExactField(unittest.TestCase):
+    def test_pairs(self):
+        rng = np.random.default_rng(3)
+        coords = rng.normal(size=(7, 3))
+        strengths = rng.uniform(-1.0, 1.0, 7)
+        points = np.vstack([rng.normal(size=(5, 3)), coords[:1]])
+        expected = np.zeros((6, 3))
+        for i, p in enumerate(points):
+            for c, s in zip(coords, strengths):
+                if np.any(p != c):
+                    expected[i] += s * (p - c) / np.linalg.norm(p - c) ** 3
+        npt.assert_allclose(exact_field(points, coords, strengths), expected, rtol=1e-10)
+
+class TestOctree(unittest.TestCase):
+    def test_accuracy(self):
+        rng = np.random.default_rng(4)
+        coords = rng.normal(size=(3000, 3))
+        strengths = rng.uniform(0.5, 1.0, 3000)
+        points = np.vstack([rng.normal(size=(200, 3)), coords[:200]])
+        expected = exact_field(points, coords, strengths)
+        for theta, median, largest in ((0.0, 1e-10, 1e-9), (0.5, 5e-3, 5e-2)):
+            field = Octree(coords, strengths).field(points, theta)
+            error = np.linalg.norm(field - expected, axis=1) / np.linalg.norm(expected, axis=1)
+            self.assertLess(np.median(error), median)
+            self.assertLess(error.max(), largest)
+
+    def test_coincident(self):
+        coords = np.zeros((40, 3))
+        field = Octree(coords, np.ones(40)).field(np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 2.0]]))
+        npt.assert_allclose(field, [[0.0, 0.0, 0.0], [0.0, 0.0, 10.0]])
+
+class TestForceField(unittest.TestCase):
+    def test_signs(self):
+        rng = np.random.default_rng(5)
+        coords = rng.normal(size=(600, 3))
+        strengths = np.where(np.arange(600) % 2 == 0, 1.0, -1.5)
+        points = rng.normal(size=(100, 3)) * 3
+        forces = ForceField(coords, strengths, theta=0.5, exact_limit=100)
+        self.assertEqual(len(forces.octrees), 2)
+        expected = exact_field(points, coords, strengths)
+        error = np.linalg.norm(forces.field(points) - expected, axis=1) / np.linalg.norm(expected, axis=1)
+        self.assertLess(np.median(error), 1e-2)
+        self.assertLess(error.max(), 5e-2)
+
+    def test_self_gravity(self):
+        # Every source also a point, past the exact limit, at the default theta
+        rng = np.random.default_rng(3)
+        coords = rng.normal(size=(EXACT_LIMIT + 1, 3))
+        strengths = -rng.uniform(0.5, 1.0, coords.shape[0])
+        forces = ForceField(coords, strengths)
+        self.assertFalse(forces.exact)
+        expected = exact_field(coords, coords, strengths)
+        error = np.linalg.norm(forces.field(coords) - expected, axis=1)
+        magnitude = np.linalg.norm(expected, axis=1)
+        self.assertLess(np.median(error / magnitude), 5e-3)
+        self.assertLess((error / magnitude).max(), 0.2)
+        self.assertLess(error.max(), 1e-2 * magnitude.max())
+
+    def test_gravity(self):
+        store = ParticleStore(capacity=4)
+        store.add(np.array([[-1.0, 0.0, 0.0], [1.0, 0.0, 0.0]]), np.zeros((2, 3)), 2.0, ttl=10.0)
+        repulsor = AntiAttractor(pyrr.Vector3([0.0, 0.0, 4.0]), 8.0)
+        store.step(repulsor, gravity=0.5)
+        # Pulled towards each other by 2 * 0.5 * 2 / 2**2, pushed down by 2 * 8 / 17
+        push = 2.0 * 8.0 / 17.0 ** 1.5 * np.array([[-1.0, 0.0, -4.0], [1.0, 0.0, -4.0]])
+        npt.assert_allclose(store.acceleration, push + [[0.5, 0.0, 0.0], [-0.5, 0.0, 0.0]], rtol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
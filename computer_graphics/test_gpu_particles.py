@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+import moderngl as mgl
+from .gpu_particles import TransformFeedbackSimulation
+from .particles import AntiAttractor, ParticleStore
+from .solid import createCube
+
+class TestTransformFeedback(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.ctx = mgl.create_standalone_context(backend='egl')
+        except Exception as error:
+            raise unittest.SkipTest(f"No headless OpenGL context: {error}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ctx.release()
+
+    def test_matches_cpu(self):
+        collider = createCube()
+        antiat = [AntiAttractor(pyrr.Vector3(np.array([-2.0, 2.0, 2.0]), dtype='f4'), 1e+8),
+                  AntiAttractor(pyrr.Vector3(np.array([1.0, -3.0, 0.0]), dtype='f4'), -5e+7)]
+        for integrator in ("euler", "symplectic", "verlet"):
+            with self.subTest(integrator=integrator):
+                self.compare(antiat, collider, integrator)
+
+    def compare(self, antiat, collider, integrator):
+        rng = np.random.default_rng(2)
+        cpu = ParticleStore(capacity=48)
+        gpu_store = ParticleStore(capacity=48)
+        gpu = TransformFeedbackSimulation(self.ctx, gpu_store)
+        for tick in range(24):
+            cpu.retire()
+            gpu_store.retire()
+            cpu.step(antiat, collider, dt=0.5, integrator=integrator)
+            gpu.step(antiat, collider, dt=0.5, integrator=integrator)
+            position = rng.uniform(-2.0, 2.0, (5, 3))
+            velocity = rng.uniform(-0.2, 0.2, (5, 3))
+            cpu.add(position, velocity, 1e-9, ttl=6.0)
+            gpu.upload(gpu_store.add(position, velocity, 1e-9, ttl=6.0))
+        # The live range wrapped around the end of the ring
+        self.assertEqual(len(gpu_store.spans()), 2)
+        state = gpu.read()
+        for name in ("position", "velocity", "acceleration", "mass"):
+            npt.assert_allclose(state[name], getattr(cpu, name), rtol=1e-4, atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import math
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .lod import LodChain
+from .solid import createCone, createCilinder
+
+class TestPieces(unittest.TestCase):
+    def test_cilinder(self):
+        for pieces in (8, 24):
+            solid = createCilinder(pieces)
+            # Two rims and the centres of both caps
+            self.assertEqual(solid.coords.shape[0], 2 * pieces + 2)
+            self.assertEqual(solid.topology.triangles.shape[0], 4 * pieces)
+
+    def test_too_few(self):
+        with self.assertRaises(RuntimeError):
+            createCone(2)
+
+class TestLodChain(unittest.TestCase):
+    def test_levels(self):
+        chain = LodChain(createCilinder, levels=(8, 90, 24))
+        self.assertEqual(chain.pieces, [90, 24, 8])
+        triangles = [solid.topology.triangles.shape[0] for solid in chain.solids]
+        self.assertEqual(triangles, sorted(triangles, reverse=True))
+
+    def test_select(self):
+        chain = LodChain(createCone)
+        fov = math.pi / 2
+        self.assertIs(chain.select((0.0, 0.0, 1.2), fov, 1080), chain.finest)
+        self.assertEqual(chain.level, 0)
+        self.assertIs(chain.select((0.0, 0.0, 0.0), fov, 1080), chain.finest)
+        self.assertIs(chain.select((0.0, 0.0, 1e4), fov, 1080), chain.solids[-1])
+        levels = []
+        for z in (1.2, 3.0, 30.0, 300.0):
+            chain.select((0.0, 0.0, z), fov, 1080)
+            levels.append(chain.level)
+        self.assertEqual(levels, sorted(levels))
+        self.assertLess(levels[0], levels[-1])
+
+    def test_transform(self):
+        chain = LodChain(createCilinder, levels=(24, 8))
+        chain.transform(pyrr.Matrix44.from_translation(np.array([0.0, 0.0, 10.0]), dtype='f4'))
+        for solid in chain.solids:
+            npt.assert_allclose(solid.coords[:, 2].mean(), 10.0, atol=1e-5)
+        self.assertIs(chain.select((0.0, 0.0, 11.5), math.pi / 2, 1080), chain.finest)
+
+if __name__ == '__main__':
+    unittest.main()
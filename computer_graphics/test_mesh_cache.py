@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import numpy.testing as npt
+
+from . import mesh_cache
+from .revolution import Axis
+from .solid import Solid, createCone, createCilinder, createCube, createDodecahedron, \
+    buildDodecahedron
+
+class TestMeshCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {mesh_cache.CACHE_DIR_ENV: self.directory.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.directory.cleanup()
+
+    def files(self):
+        return sorted(Path(self.directory.name).glob("*.npz"))
+
+    def test_round_trip(self):
+        layout = ["position", "normal", "smooth_normal", "index", "oriented_index", "line_index"]
+        for factory in (createCube, createDodecahedron, lambda: createCone(24),
+                        lambda: createCilinder(24)):
+            built = factory()
+            with mock.patch.object(Solid, "cache_arrays", side_effect=AssertionError):
+                loaded = factory()
+            self.assertEqual(loaded.face_labels, built.face_labels)
+            self.assertEqual(loaded.names, built.names)
+            self.assertEqual(loaded.is_cube, built.is_cube)
+            npt.assert_array_equal(loaded.face_flip, built.face_flip)
+            expected = built.export_buffers(layout)
+            for name, buffer in loaded.export_buffers(layout).items():
+                npt.assert_array_equal(buffer, expected[name])
+        self.assertEqual(len(self.files()), 4)
+
+    def test_key(self):
+        line = [(0.0, 1.0, 0.0), (1.0, 0.0, 0.0)]
+        key = mesh_cache.mesh_key("cone", profile=line, axis=Axis.Y, pieces=24)
+        self.assertEqual(key, mesh_cache.mesh_key("cone", pieces=24, axis=Axis.Y, profile=line))
+        self.assertNotEqual(key, mesh_cache.mesh_key("cone", profile=line, axis=Axis.Y, pieces=25))
+        self.assertNotEqual(key, mesh_cache.mesh_key("cone", profile=line, axis=Axis.X, pieces=24))
+
+    def test_corrupt(self):
+        createDodecahedron()
+        self.files()[0].write_bytes(b"not a zip")
+        npt.assert_array_equal(createDodecahedron().coords, buildDodecahedron().coords)
+
+    def test_truncated(self):
+        createDodecahedron()
+        path = self.files()[0]
+        path.write_bytes(path.read_bytes()[:path.stat().st_size // 2])
+        self.assertIsNone(mesh_cache.load(path.stem))
+        npt.assert_array_equal(createDodecahedron().coords, buildDodecahedron().coords)
+
+    def test_missing_member(self):
+        createDodecahedron()
+        path = self.files()[0]
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files if name != "loop_ptr"}
+        np.savez(path, **arrays)
+        npt.assert_array_equal(createDodecahedron().coords, buildDodecahedron().coords)
+        # Regenerated over the broken entry
+        with np.load(path) as data:
+            self.assertIn("loop_ptr", data.files)
+
+    def test_opt_in(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(mesh_cache.CACHE_DIR_ENV)
+            self.assertIsNone(mesh_cache.cache_dir())
+            with mock.patch.object(Solid, "cache_arrays", side_effect=AssertionError):
+                createCube()
+            with mock.patch.object(mesh_cache, "_enabled_dir", None):
+                mesh_cache.enable(Path(self.directory.name))
+                self.assertEqual(mesh_cache.cache_dir(), Path(self.directory.name))
+                createCube()
+        self.assertEqual(len(self.files()), 1)
+
+    def test_off(self):
+        with mock.patch.dict(os.environ, {mesh_cache.CACHE_DIR_ENV: "off"}), \
+                mock.patch.object(Solid, "cache_arrays", side_effect=AssertionError):
+            createCube()
+        self.assertEqual(self.files(), [])
+
+if __name__ == '__main__':
+    unittest.main()
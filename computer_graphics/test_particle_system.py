@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import pyrr
+import moderngl as mgl
+from .particle_system import ParticleSystem
+from .particles import AntiAttractor
+from .solid import createCube, createCone
+
+class TestParticleSystem(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.ctx = mgl.create_standalone_context(backend='egl')
+        except Exception as error:
+            raise unittest.SkipTest(f"No headless OpenGL context: {error}")
+        cls.program = cls.ctx.program(
+            vertex_shader='''
+                #version 330 core
+                in vec3 aPointPosition;
+                void main() { gl_Position = vec4(aPointPosition, 1.0); }
+            ''',
+            fragment_shader='''
+                #version 330 core
+                out vec4 color;
+                void main() { color = vec4(1.0); }
+            ''',
+        )
+        cls.texture = cls.ctx.texture((1, 1), 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ctx.release()
+
+    def test_population(self):
+        antiat = AntiAttractor(pyrr.Vector3(np.array([-2.0, 2.0, 2.0]), dtype='f4'), 1e+8)
+        for substeps in (1, 3):
+            with self.subTest(substeps=substeps):
+                system = ParticleSystem(self.ctx, self.program, self.texture, createCone(24),
+                                        createCube(), antiat)
+                system.substeps = substeps
+                counts = []
+                for _ in range(120):
+                    system.tick()
+                    counts.append(system.store.count)
+                    self.assertLess(system.store.age.max(), system.ttl)
+                # One spawn per tick, each alive for ttl ticks: baseline's max_age of 50
+                self.assertEqual(counts[49:], [50] * 71)
+                self.assertEqual(counts[48], 49)
+
+    def test_lower_ttl(self):
+        antiat = AntiAttractor(pyrr.Vector3(np.array([-2.0, 2.0, 2.0]), dtype='f4'), 1e+8)
+        system = ParticleSystem(self.ctx, self.program, self.texture, createCone(24),
+                                createCube(), antiat)
+        for _ in range(60):
+            system.tick()
+        system.ttl = 10.0
+        counts, expired = [], []
+        for _ in range(60):
+            system.tick()
+            counts.append(system.store.count)
+            expired.append(int(np.sum(system.store.age >= system.store.gather("ttl"))))
+        # Retirement is first in, first out: the short-lived particles wait
+        # behind the 50 tick ones, expired, until those are gone
+        self.assertEqual(counts[:40], [50] * 40)
+        self.assertEqual(expired[29], 20)
+        self.assertEqual(counts[-10:], [10] * 10)
+        self.assertEqual(expired[-10:], [0] * 10)
+
+if __name__ == '__main__':
+    unittest.main()
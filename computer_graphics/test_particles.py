@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .particles import AntiAttractor, ParticleStore
+from .solid import createCube
+
+def reference_tick(coord, velocity, acceleration, mass, collider, antiat):
+    # The per-particle update the store replaces
+    if collider.is_in(coord):
+        velocity = -velocity
+    coord = coord + velocity
+    velocity = velocity + acceleration
+    antivector = coord - antiat.coord
+    antivector = antivector / np.power(np.linalg.norm(antivector), 3)
+    return coord, velocity, mass * antiat.mass * antivector
+
+class TestParticleStore(unittest.TestCase):
+    def test_ring(self):
+        store = ParticleStore(capacity=4)
+        store.add(np.arange(9).reshape((3, 3)), np.zeros((3, 3)), 2.0, ttl=2.0)
+        store.step()
+        store.add(np.arange(9, 15).reshape((2, 3)), np.zeros((2, 3)), 2.0, ttl=5.0)
+        # Full: the oldest particle made room
+        self.assertEqual(store.count, 4)
+        self.assertEqual(store.spans(), [(1, 4), (0, 1)])
+        npt.assert_array_equal(store.position[:, 0], [3, 6, 9, 12])
+        npt.assert_array_equal(store.age, [1, 1, 0, 0])
+        npt.assert_array_equal(store.mass, np.full(4, 2.0))
+        self.assertEqual(store.retire(), 0)
+        store.step()
+        self.assertEqual(store.retire(), 2)
+        self.assertEqual(store.spans(), [(3, 4), (0, 1)])
+        for _ in range(4):
+            store.step()
+        self.assertEqual(store.retire(), 2)
+        self.assertEqual(store.spans(), [])
+        npt.assert_array_equal(store.position, np.zeros((0, 3)))
+
+    def test_overflow(self):
+        store = ParticleStore(capacity=3)
+        store.add(np.arange(15).reshape((5, 3)), np.zeros((5, 3)), 1.0, ttl=1.0)
+        npt.assert_array_equal(store.position[:, 0], [6, 9, 12])
+
+    def test_step(self):
+        collider = createCube()
+        antiat = AntiAttractor(pyrr.Vector3(np.array([-2.0, 2.0, 2.0]), dtype='f4'), 1e+8)
+        rng = np.random.default_rng(1)
+        position = rng.uniform(-2.0, 2.0, (64, 3))
+        velocity = rng.uniform(-0.2, 0.2, (64, 3))
+        store = ParticleStore()
+        store.add(position, velocity, 1e-9, ttl=100.0)
+        expected = [(p.astype(np.float32), v.astype(np.float32), np.zeros(3, dtype=np.float32))
+                    for p, v in zip(position, velocity)]
+        for _ in range(10):
+            store.step(antiat, collider)
+            expected = [reference_tick(*state, 1e-9, collider, antiat) for state in expected]
+        for name, column in (("position", 0), ("velocity", 1), ("acceleration", 2)):
+            npt.assert_allclose(getattr(store, name), [state[column] for state in expected],
+                                rtol=1e-4, atol=1e-5)
+        npt.assert_array_equal(store.age, np.full(64, 10))
+
+class TestIntegrators(unittest.TestCase):
+    def drift(self, integrator, dt):
+        # Circular orbit of radius 1 around a unit attractor, for about 8 turns
+        attractor = AntiAttractor(pyrr.Vector3([0.0, 0.0, 0.0]), -1.0)
+        store = ParticleStore(capacity=1)
+        store.add(np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]), 1.0, ttl=1e9,
+                  acceleration=np.array([-1.0, 0.0, 0.0]))
+        radii = []
+        for _ in range(round(50 / dt)):
+            store.step(attractor, dt=dt, integrator=integrator)
+            radii.append(np.linalg.norm(store.position[0]))
+        self.assertAlmostEqual(store.time, 50.0, places=3)
+        return np.abs(np.array(radii) - 1.0).max()
+
+    def test_orbit(self):
+        euler = self.drift("euler", 0.05)
+        symplectic = self.drift("symplectic", 0.05)
+        verlet = self.drift("verlet", 0.05)
+        self.assertGreater(euler, 0.5)
+        self.assertLess(symplectic, 0.05)
+        self.assertLess(verlet, 2e-3)
+        # Second order: half the step, a quarter of the error
+        self.assertLess(self.drift("verlet", 0.025), verlet / 3)
+
+    def test_unknown(self):
+        with self.assertRaises(RuntimeError):
+            ParticleStore().step(integrator="rk4")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,94 @@
 import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
 
-from .revolution import mesh_graph
+from .revolution import Axis, get_mesh_graph as mesh_graph, revolve_line, rotate_vertex, \
+    create_revolution_graph, revolution_arrays
+from .solid import Solid
 
 class TestMeshGraph(unittest.TestCase):
     def test_plain(self):
         graph = mesh_graph((2, 2))
 
+class TestRevolveLine(unittest.TestCase):
+    def test_matches_matrices(self):
+        line = [pyrr.Vector3((1.0, 2.0, 0.5)), pyrr.Vector3((-0.3, 0.0, 1.0))]
+        angles = np.linspace(0.0, 2 * np.pi, num=7)
+        for axis in Axis:
+            rotated = revolve_line(line, axis, angles)
+            self.assertEqual(rotated.shape, (2, 7, 3))
+            for i, point in enumerate(line):
+                for j, angle in enumerate(angles):
+                    npt.assert_allclose(rotated[i, j], np.asarray(rotate_vertex(point, axis, angle)),
+                                        atol=1e-6)
+
+    def test_arbitrary_axis(self):
+        axis = np.array([1.0, 1.0, 0.0])
+        rotated = revolve_line([(1.0, 0.0, 0.0)], axis, np.array([0.0, np.pi / 2, np.pi]))[0]
+        npt.assert_allclose(rotated @ axis, 1.0)
+        npt.assert_allclose(rotated[2], (0.0, 1.0, 0.0), atol=1e-12)
+        npt.assert_allclose(np.linalg.norm(rotated, axis=1), 1.0)
+
+    def test_graph_coords(self):
+        graph = create_revolution_graph([pyrr.Vector3((1.0, 1.0, 0.0)),
+                                         pyrr.Vector3((1.0, 0.0, 0.0))], Axis.Y)
+        coords = np.array(graph.vs["coord"])
+        self.assertEqual(coords.shape, (2 * graph["pieces"], 3))
+        npt.assert_allclose(coords[[0, graph["pieces"]]], [(1.0, 1.0, 0.0), (1.0, 0.0, 0.0)])
+        npt.assert_allclose(np.hypot(coords[:, 0], coords[:, 2]), 1.0)
+
+class TestGrid(unittest.TestCase):
+    def test_matches_graph(self):
+        line = [pyrr.Vector3((0.5, 2.0, 0.0)), pyrr.Vector3((1.0, 1.0, 0.0)),
+                pyrr.Vector3((1.0, 0.0, 0.0))]
+        for pieces in (3, 5, 12):
+            graph_solid = Solid(create_revolution_graph(line, Axis.Y, pieces), is_polar=False)
+            coords, edges, face_ptr, face_vertices, labels = revolution_arrays(line, Axis.Y, pieces)
+            solid = Solid.from_arrays(coords, edges, face_ptr, face_vertices, labels, ordered=True)
+            npt.assert_array_equal(solid.edges, graph_solid.edges)
+            self.assertEqual(solid.face_labels, graph_solid.face_labels)
+            npt.assert_array_equal(solid.topology.loop_vertices, graph_solid.topology.loop_vertices)
+            npt.assert_array_equal(solid.get_oriented_triangles_idx(),
+                                   graph_solid.get_oriented_triangles_idx())
+            npt.assert_allclose(solid.coords, graph_solid.coords)
+            npt.assert_array_equal(solid.get_cover_line_idx(), graph_solid.edges.reshape(-1))
+
+class TestCaps(unittest.TestCase):
+    def get_volume(self, solid: Solid) -> float:
+        triangles = solid.coords[solid.get_oriented_triangles_idx().reshape((-1, 3))].astype(np.float64)
+        return np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6
+
+    def get_solid(self, line, pieces: int, **kwargs) -> Solid:
+        coords, edges, face_ptr, face_vertices, labels = revolution_arrays(line, Axis.Y, pieces, **kwargs)
+        return Solid.from_arrays(coords, edges, face_ptr, face_vertices, labels, ordered=True)
+
+    def test_apex(self):
+        solid = self.get_solid([(0.0, 1.0, 0.0), (1.0, 0.0, 0.0)], 16)
+        self.assertEqual(solid.coords.shape[0], 17)
+        self.assertTrue(np.all(np.diff(solid.face_ptr) == 3))
+
+    def test_welded(self):
+        pieces = 64
+        for line, volume in (([(0.0, 1.0, 0.0), (1.0, 0.0, 0.0)], np.pi / 3),
+                             ([(1.0, 1.0, 0.0), (1.0, 0.0, 0.0)], np.pi),
+                             ([(0.0, 1.0, 0.0), (1.0, 0.0, 0.0), (0.0, -1.0, 0.0)], 2 * np.pi / 3)):
+            solid = self.get_solid(line, pieces, caps=True)
+            # Closed: every edge borders exactly two faces
+            npt.assert_array_equal(np.diff(solid.topology.edge_face_ptr), 2)
+            polygon = pieces / (2 * np.pi) * np.sin(2 * np.pi / pieces)
+            npt.assert_allclose(self.get_volume(solid), volume * polygon, rtol=1e-5)
+
+    def test_unwelded(self):
+        welded = self.get_solid([(1.0, 1.0, 0.0), (1.0, 0.0, 0.0)], 12, caps=True)
+        solid = self.get_solid([(1.0, 1.0, 0.0), (1.0, 0.0, 0.0)], 12, caps=True, weld=False)
+        self.assertEqual(solid.coords.shape[0], welded.coords.shape[0] + 2 * 12)
+        self.assertEqual(int(solid.topology.face_component.max()), 2)
+        npt.assert_allclose(self.get_volume(solid), self.get_volume(welded), rtol=1e-6)
+
+    def test_along_axis(self):
+        with self.assertRaises(RuntimeError):
+            revolution_arrays([(0.0, 1.0, 0.0), (0.0, 0.0, 0.0)], Axis.Y, 8)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
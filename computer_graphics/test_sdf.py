@@ -0,0 +1,92 @@
+import pickle
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from .particles import ParticleStore
+from .sdf import DistanceGrid
+from .solid import createCube, createCilinder
+
+class TestDistanceGrid(unittest.TestCase):
+    def grid_points(self, grid):
+        axes = [grid.lo[axis] + grid.cell * np.arange(grid.shape[axis]) for axis in range(3)]
+        return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape((-1, 3))
+
+    def test_cube(self):
+        cube = createCube()
+        grid = DistanceGrid(cube, resolution=16)
+        points = self.grid_points(grid)
+        distance, _, _ = cube.get_bvh().closest_points(points)
+        inside = cube.contains_many(points)
+        npt.assert_allclose(grid.values.reshape(-1), np.where(inside, -distance, distance), atol=1e-5)
+
+    def test_cilinder(self):
+        grid = DistanceGrid(createCilinder(48), resolution=24)
+        points = self.grid_points(grid)
+        radius = np.hypot(points[:, 0], points[:, 2])
+        # Analytic distance to the capped unit cylinder, up to the facets and the flood
+        outside = np.stack([np.maximum(radius - 1, 0),
+                            np.maximum(np.maximum(-points[:, 1], points[:, 1] - 1), 0)], axis=1)
+        inside = np.minimum(np.maximum(radius - 1, np.maximum(-points[:, 1], points[:, 1] - 1)), 0)
+        expected = np.linalg.norm(outside, axis=1) + inside
+        npt.assert_allclose(grid.values.reshape(-1), expected, atol=0.2 * grid.cell + 3e-3)
+
+    def test_sample(self):
+        grid = DistanceGrid(createCube(), resolution=16)
+        rng = np.random.default_rng(8)
+        points = rng.uniform(-0.6, 0.6, (100, 3))
+        distance, gradient = grid.sample(points)
+        step = 1e-6
+        numeric = np.stack([(grid.sample(points + step * e)[0] - grid.sample(points - step * e)[0])
+                            / (2 * step) for e in np.eye(3)], axis=1)
+        npt.assert_allclose(gradient, numeric, atol=1e-6)
+        far, far_gradient = grid.sample(np.array([[5.0, 0.0, 0.0]]))
+        self.assertGreater(far[0], 4.0)
+        npt.assert_allclose(far_gradient, [[1.0, 0.0, 0.0]])
+
+    def test_collide(self):
+        cube = createCube()
+        grid = DistanceGrid(cube, resolution=16)
+        half = cube.coords.max()
+        position = np.array([[half - 0.05, 0.0, 0.0], [half - 0.05, 0.0, 0.0], [0.9, 0.0, 0.0]],
+                            dtype=np.float32)
+        velocity = np.array([[-0.1, 0.2, 0.0], [0.1, 0.0, 0.0], [-0.1, 0.0, 0.0]], dtype=np.float32)
+        hit = grid.collide(position, velocity)
+        npt.assert_array_equal(hit, [True, False, False])
+        # Put back on the face and mirrored about its normal
+        npt.assert_allclose(position[0], [half, 0.0, 0.0], atol=1e-3)
+        npt.assert_allclose(velocity[0], [0.1, 0.2, 0.0], atol=1e-3)
+        npt.assert_allclose(velocity[1:], [[0.1, 0.0, 0.0], [-0.1, 0.0, 0.0]])
+
+    def test_store(self):
+        grid = DistanceGrid(createCilinder(48), resolution=24)
+        store = ParticleStore(capacity=256)
+        rng = np.random.default_rng(9)
+        angle = rng.uniform(0, 2 * np.pi, 256)
+        position = np.stack([2 * np.cos(angle), rng.uniform(0.2, 0.8, 256), 2 * np.sin(angle)], axis=1)
+        store.add(position, -0.05 * position * [1.0, 0.0, 1.0], 1.0, ttl=100.0)
+        for _ in range(60):
+            store.step(collider=grid)
+        # Nobody got through the wall, and everybody turned around
+        radius = np.hypot(store.position[:, 0], store.position[:, 2])
+        self.assertGreater(radius.min(), 0.9)
+        self.assertTrue(np.all(np.einsum('ij,ij->i', store.velocity, store.position * [1, 0, 1]) > 0))
+
+    def test_transformed(self):
+        cube = createCube()
+        grid = DistanceGrid(cube, resolution=16)
+        center = cube.coords.mean(axis=0)
+        self.assertLess(grid.sample(center)[0][0], 0)
+        cube.transform(pyrr.Matrix44.from_translation(np.array([5.0, 0.0, 0.0]), dtype='f4'))
+        self.assertFalse(grid.is_current(cube))
+        # Rebuilt on use, against the moved cube
+        self.assertGreater(grid.sample(center)[0][0], 0)
+        self.assertLess(grid.sample(center + [5.0, 0.0, 0.0])[0][0], 0)
+        self.assertTrue(grid.is_current(cube))
+        # Copies for other processes carry the values but not the solid
+        copy = pickle.loads(pickle.dumps(grid))
+        self.assertIsNone(copy.solid)
+        npt.assert_array_equal(copy.values, grid.values)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import pyrr
+from multiprocessing import shared_memory
+from .shared_particles import SharedParticleStore, ShardedSimulation, split_spans
+from .particles import AntiAttractor, ParticleStore
+from .solid import createCube
+from .sdf import DistanceGrid
+
+class TestSplitSpans(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(split_spans([(6, 10), (0, 3)], 2), [[(6, 9)], [(9, 10), (0, 3)]])
+        self.assertEqual(split_spans([(6, 10), (0, 3)], 3), [[(6, 8)], [(8, 10)], [(0, 3)]])
+        self.assertEqual(split_spans([(0, 2)], 3), [[], [(0, 1)], [(1, 2)]])
+        self.assertEqual(split_spans([], 2), [[], []])
+
+class TestShardedSimulation(unittest.TestCase):
+    def setUp(self):
+        self.store = SharedParticleStore(capacity=512)
+        self.addCleanup(self.store.close)
+
+    def test_shared(self):
+        other = SharedParticleStore(capacity=512, name=self.store.shm.name)
+        self.store.add(np.ones((3, 3)), np.zeros((3, 3)), 1.0, ttl=1.0)
+        other.head, other.count = self.store.head, self.store.count
+        # Views straight into the block, no copies on either side
+        npt.assert_array_equal(other.views("position")[0], np.ones((3, 3)))
+        other.close()
+        self.assertFalse(self.store.views("position")[0].flags.owndata)
+
+    def test_step(self):
+        rng = np.random.default_rng(4)
+        position = rng.uniform(-2.0, 2.0, (500, 3))
+        velocity = rng.uniform(-0.2, 0.2, (500, 3))
+        antiat = [AntiAttractor(np.array([-2.0, 2.0, 2.0]), 10.0)]
+        expected = ParticleStore(capacity=512)
+        for store in (expected, self.store):
+            # Wrapped around the end of the ring
+            store.add(position[:300], velocity[:300], 1e-3, ttl=1.0)
+            store.step()
+            store.retire()
+            store.add(position, velocity, 1e-3, ttl=100.0)
+        self.assertEqual(len(self.store.spans()), 2)
+        simulation = ShardedSimulation(self.store, workers=3)
+        self.addCleanup(simulation.close)
+        for collider in (createCube(), DistanceGrid(createCube())):
+            for _ in range(4):
+                expected.step(antiat, collider, dt=0.5, integrator="verlet")
+                simulation.step(antiat, collider, dt=0.5, integrator="verlet")
+        # Workers collide against the moved solid too
+        collider.solid.transform(pyrr.Matrix44.from_translation(np.array([1.0, 0.0, 0.0]), dtype='f4'))
+        for _ in range(4):
+            simulation.step(antiat, collider, dt=0.5, integrator="verlet")
+            expected.step(antiat, collider, dt=0.5, integrator="verlet")
+        for name in ("position", "velocity", "acceleration"):
+            npt.assert_array_equal(getattr(self.store, name), getattr(expected, name))
+        self.assertEqual(self.store.time, expected.time)
+
+    def test_errors(self):
+        simulation = ShardedSimulation(self.store, workers=2)
+        self.addCleanup(simulation.close)
+        self.store.add(np.zeros((4, 3)), np.zeros((4, 3)), 1.0, ttl=1.0)
+        with self.assertRaises(RuntimeError):
+            simulation.step(integrator="rk4")
+        # A worker failing reports back and the others keep going
+        with self.assertRaises(RuntimeError):
+            simulation.step(collider="cube")
+        simulation.step()
+
+    def test_close(self):
+        store = SharedParticleStore(capacity=16)
+        ShardedSimulation(store, workers=2).close()
+        store.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=store.shm.name)
+
+if __name__ == '__main__':
+    unittest.main()
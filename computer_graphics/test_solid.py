@@ -2,7 +2,9 @@ import unittest
 import numpy as np
 import numpy.testing as npt
 import igraph as ig
-from .solid import Solid
+import pyrr
+from .solid import Solid, createCube, createDodecahedron, createTetrahedron
+from .revolution import Axis, create_revolution_graph
 from itertools import permutations
 from typing import Any, List
 
@@ -311,5 +313,237 @@ class TestGetCoverTrianglesTex(unittest.TestCase):
         ] * 6)
         self.assertTrue(np.equal(expected, line).all())
 
+class TestArrayStorage(unittest.TestCase):
+    def test_cube(self):
+        solid = get_cube_graph()
+        self.assertEqual(solid.coords.shape, (8, 3))
+        self.assertEqual(solid.coords.dtype, np.float32)
+        self.assertEqual(solid.edges.shape, (12, 2))
+        self.assertEqual(solid.face_ptr.tolist(), [0, 4, 8, 12, 16, 20, 24])
+        npt.assert_array_equal(solid.face_members(0), [0, 1, 2, 3])
+
+    def test_graph_view(self):
+        solid = get_cube_graph()
+        self.assertNotIn("coord", solid.graph.vs.attributes())
+        self.assertEqual(solid.graph.vs[6]["faces"], [2, 3, 5])
+
+    def test_from_arrays(self):
+        solid = get_cube_graph()
+        copy = Solid.from_arrays(solid.coords, solid.edges, solid.face_ptr, solid.face_vertices)
+        npt.assert_array_equal(copy.get_vertices(), solid.get_vertices())
+        self.assertEqual(copy.get_common_edge(0, 1), (0, 1))
+
+class TestExportBuffers(unittest.TestCase):
+    def test_cube(self):
+        solid = get_cube_graph()
+        buffers = solid.export_buffers(["position", "normal", "vertex", "index"])
+        self.assertEqual(buffers["position"].shape, (36, 3))
+        self.assertEqual(buffers["normal"].shape, (36, 3))
+        self.assertEqual(buffers["index"].dtype, np.uint32)
+        for arr in buffers.values():
+            self.assertTrue(arr.flags["C_CONTIGUOUS"])
+        self.assertIs(buffers["vertex"], solid.coords)
+        npt.assert_array_equal(buffers["position"], solid.coords[buffers["index"]])
+
+    def test_unknown(self):
+        with self.assertRaises(RuntimeError):
+            get_cube_graph().export_buffers(["colour"])
+
+class TestTopology(unittest.TestCase):
+    def test_cube_loops(self):
+        topology = get_cube_graph().topology
+        npt.assert_array_equal(topology.loop(0), [0, 3, 2, 1])
+        npt.assert_array_equal(topology.loop(5), [4, 7, 6, 5])
+
+    def test_penta_loop(self):
+        npt.assert_array_equal(get_penta_graph().topology.loop(0), [0, 4, 3, 2, 1])
+
+    def test_cube_adjacency(self):
+        solid = get_cube_graph()
+        topology = solid.topology
+        npt.assert_array_equal(topology.faces_of_vertex(6), [2, 3, 5])
+        for e_idx, (u, v) in enumerate(solid.edges):
+            faces = topology.faces_of_edge(e_idx)
+            self.assertEqual(len(faces), 2)
+            for f in faces:
+                self.assertIn(u, topology.loop(f))
+                self.assertIn(v, topology.loop(f))
+
+    def test_not_cycle(self):
+        graph = get_square_graph().graph.copy()
+        graph.delete_edges([0])
+        with self.assertRaises(RuntimeError):
+            Solid(graph).topology
+
+class TestTransform(unittest.TestCase):
+    def get_matrices(self) -> List[pyrr.Matrix44]:
+        return [
+            pyrr.Matrix44.from_translation(np.array([1.0, 2.0, 3.0]), dtype='f4'),
+            pyrr.Matrix44.from_x_rotation(0.3, dtype='f4'),
+            pyrr.Matrix44.from_scale(np.array([2.0, 1.0, 0.5]), dtype='f4'),
+        ]
+
+    def test_matches_pyrr(self):
+        solid = get_cube_graph()
+        points = [pyrr.Vector3(c) for c in solid.coords]
+        for matrix in self.get_matrices():
+            solid.transform(matrix)
+            points = [matrix * p for p in points]
+        npt.assert_allclose(solid.coords, np.array(points), atol=1e-5)
+
+    def test_lazy(self):
+        eager = get_cube_graph()
+        lazy = get_cube_graph()
+        lazy.lazy_transform = True
+        for matrix in self.get_matrices():
+            eager.transform(matrix)
+            lazy.transform(matrix)
+        self.assertIsNotNone(lazy._pending)
+        npt.assert_allclose(lazy.coords, eager.coords, atol=1e-5)
+        self.assertIsNone(lazy._pending)
+
+    def test_projective(self):
+        matrix = np.eye(4)
+        matrix[2, 3] = 1.0
+        points = Solid.apply_matrix(np.array([[1.0, 2.0, 1.0]]), matrix)
+        npt.assert_allclose(points, [[0.5, 1.0, 0.5]])
+
+class TestNormales(unittest.TestCase):
+    def test_matches_single(self):
+        solid = createCube()
+        triangles = solid.get_cover_triangles().reshape((-1, 3, 3))
+        normales = solid.get_normales().reshape((-1, 3))
+        for triangle, normal in zip(triangles, normales):
+            npt.assert_allclose(normal, solid.get_normal(triangle), atol=1e-6)
+
+    def test_outwards(self):
+        solid = createCube()
+        triangles = solid.get_cover_triangles().reshape((-1, 3, 3))
+        normales = solid.get_normales().reshape((-1, 3))
+        self.assertTrue(np.all(np.einsum('ij,ij->i', normales, triangles.mean(axis=1)) > 0))
+
+    def test_vertex_normales(self):
+        solid = createCube()
+        normales = solid.get_vertex_normales().reshape((-1, 3))
+        expected = solid.coords / np.linalg.norm(solid.coords, axis=1, keepdims=True)
+        npt.assert_allclose(normales, expected, atol=1e-5)
+
+class TestOrientation(unittest.TestCase):
+    def test_torus(self):
+        # Not star-shaped around its centre: the inner wall faces the origin
+        angles = np.linspace(0, 2 * np.pi, num=12, endpoint=False)
+        line = [pyrr.Vector3((2.0 + 0.5 * np.cos(a), 0.5 * np.sin(a), 0.0)) for a in angles]
+        solid = Solid(create_revolution_graph(line, Axis.Y), is_polar=False)
+        triangles = solid.coords[solid.get_cover_triangles_idx().reshape((-1, 3))]
+        centers = triangles.mean(axis=1)
+        radial = centers * np.array([1.0, 0.0, 1.0])
+        core = 2.0 * radial / np.linalg.norm(radial, axis=1, keepdims=True)
+        normales = solid.get_normales().reshape((-1, 3))
+        self.assertTrue(np.all(np.einsum('ij,ij->i', normales, centers - core) > 0))
+
+    def test_oriented_index(self):
+        solid = createCube()
+        triangles = solid.coords[solid.get_oriented_triangles_idx().reshape((-1, 3))]
+        normales = Solid.cross_normals(triangles)
+        npt.assert_allclose(normales, solid.get_normales().reshape((-1, 3)))
+
+    def test_mirror(self):
+        solid = createCube()
+        solid.get_normales()
+        solid.transform(pyrr.Matrix44.from_scale(np.array([-1.0, 1.0, 1.0]), dtype='f4'))
+        triangles = solid.get_cover_triangles().reshape((-1, 3, 3))
+        normales = solid.get_normales().reshape((-1, 3))
+        self.assertTrue(np.all(np.einsum('ij,ij->i', normales, triangles.mean(axis=1)) > 0))
+
+class TestContainsMany(unittest.TestCase):
+    def test_cube(self):
+        solid = get_cube_graph()
+        points = np.array([
+            (0.5, 0.5, 0.5),
+            (0.1, 0.9, 0.2),
+            (1.5, 0.5, 0.5),
+            (0.5, -0.1, 0.5),
+        ])
+        npt.assert_array_equal(solid.contains_many(points), [True, True, False, False])
+
+    def test_polyhedra(self):
+        rng = np.random.default_rng(1)
+        points = rng.uniform(-1.2, 1.2, size=(2000, 3))
+        radii = np.linalg.norm(points, axis=1)
+        for solid in (createDodecahedron(), createTetrahedron()):
+            inside = solid.contains_many(points)
+            self.assertTrue(np.all(radii[inside] <= 1.0 + 1e-5))
+            self.assertTrue(solid.is_in(np.zeros(3)))
+
+    def test_transform(self):
+        solid = createCube()
+        solid.contains_many(np.zeros((1, 3)))
+        solid.transform(pyrr.Matrix44.from_translation(np.array([5.0, 0.0, 0.0]), dtype='f4'))
+        npt.assert_array_equal(solid.contains_many(np.array([(0.0, 0.0, 0.0), (5.0, 0.0, 0.0)])),
+                               [False, True])
+
+class TestToCartesian(unittest.TestCase):
+    def test_cartesian_point(self):
+        points = np.array([
+            (1.0, 0.0, 0.0),
+            (2.0, np.pi / 2, 0.0),
+            (1.0, 0.3, np.pi / 2),
+            (0.5, 1.2, -0.4),
+        ])
+        batch = Solid.cartesian_point(points)
+        for point, expected in zip(points, batch):
+            single = Solid.cartesian_point(pyrr.Vector3(point))
+            self.assertIsInstance(single, pyrr.Vector3)
+            npt.assert_allclose(np.asarray(single), expected)
+        npt.assert_allclose(batch[:3], [(1.0, 0.0, 0.0), (0.0, 2.0, 0.0), (0.0, 0.0, 1.0)],
+                            atol=1e-12)
+
+    def test_disconnected(self):
+        graph = ig.Graph(n=4, edges=[(0, 1), (2, 3)], vertex_attrs={
+            "coord": [(1.0, 0.0, 0.0)] * 4,
+        })
+        solid = Solid(graph).to_cartesian()
+        npt.assert_allclose(solid.coords, [(1.0, 0.0, 0.0)] * 4)
+
+    def test_mapping(self):
+        cylindrical = lambda p: np.stack((p[:, 0] * np.cos(p[:, 1]), p[:, 2],
+                                          p[:, 0] * np.sin(p[:, 1])), axis=1)
+        graph = ig.Graph(n=2, vertex_attrs={
+            "coord": [(1.0, 0.0, 2.0), (2.0, np.pi / 2, 3.0)],
+        })
+        solid = Solid(graph).to_cartesian(cylindrical)
+        npt.assert_allclose(solid.coords, [(1.0, 2.0, 0.0), (0.0, 3.0, 2.0)], atol=1e-6)
+
+class TestCache(unittest.TestCase):
+    def test_repeated_reads(self):
+        solid = createDodecahedron()
+        for getter in (solid.get_cover_triangles, solid.get_normales, solid.get_normales_repeated,
+                       solid.get_cover_line, solid.get_vertex_normales, solid.get_face_normals):
+            value = getter()
+            self.assertIs(getter(), value)
+            self.assertFalse(value.flags.writeable)
+
+    def test_transform(self):
+        solid = createCube()
+        triangles = solid.get_cover_triangles()
+        line_idx = solid.get_cover_line_idx()
+        matrix = pyrr.Matrix44.from_translation(np.array([1.0, 2.0, 3.0]), dtype='f4')
+        solid.transform(matrix)
+        self.assertIs(solid.get_cover_line_idx(), line_idx)
+        moved = triangles.reshape((-1, 3)) + (1.0, 2.0, 3.0)
+        npt.assert_allclose(solid.get_cover_triangles(), moved.reshape(-1), rtol=1e-6)
+
+    def test_face_normal_copy(self):
+        solid = createDodecahedron()
+        for f_pos, label in enumerate(solid.face_labels):
+            loop = solid.topology.loop(f_pos)[0:3]
+            if solid.face_flip[f_pos]:
+                loop = loop[[0, 2, 1]]
+            expected = Solid.cross_normals(solid.coords[loop][None, :, :])[0]
+            npt.assert_allclose(solid.get_face_normal(label), expected, rtol=1e-6)
+        normal = solid.get_face_normal(0)
+        normal[1] = 0.0
+        self.assertNotEqual(solid.get_face_normal(0)[1], 0.0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+import numpy as np
+import numpy.testing as npt
+from .spatial_hash import SpatialHash, CELL_BITS, counting_order
+from .particles import ParticleStore
+
+def brute_pairs(points, radius):
+    away = points[:, None, :] - points[None, :, :]
+    i, j = np.nonzero(np.triu(np.einsum('ijk,ijk->ij', away, away) <= radius * radius, 1))
+    return set(zip(i.tolist(), j.tolist()))
+
+class TestSpatialHash(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        # Negative cells too, where the hash has to stay in the table
+        self.points = rng.uniform(-2.0, 2.0, (800, 3))
+
+    def test_pairs(self):
+        for radius in (0.1, 0.25):
+            grid = SpatialHash(self.points, 0.25)
+            i, j = grid.pairs(radius)
+            self.assertTrue(np.all(i < j))
+            self.assertEqual(len(i), len(set(zip(i.tolist(), j.tolist()))))
+            self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_pairs(self.points, radius))
+        # Few points per chunk, far from the origin
+        with mock.patch("computer_graphics.spatial_hash.CHUNK", 64):
+            far = self.points + 1e4
+            i, j = SpatialHash(far, 0.25).pairs(0.25)
+            self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_pairs(far, 0.25))
+        i, j = SpatialHash(np.zeros((0, 3)), 0.25).pairs(0.25)
+        self.assertEqual((i.shape, j.shape), ((0,), (0,)))
+        with self.assertRaises(RuntimeError):
+            SpatialHash(self.points, 0.25).pairs(0.5)
+        with self.assertRaises(RuntimeError):
+            SpatialHash(self.points, 0.0)
+
+    def test_outliers(self):
+        # One particle flung far away, and cells whose ids wrap onto nearby ones
+        alias = self.points[:3] + [0.25 * (1 << CELL_BITS), 0.0, 0.0]
+        points = np.vstack([self.points, [[1e9, -1e9, 3e8]], alias, alias[:1] + 0.01])
+        i, j = SpatialHash(points, 0.25).pairs(0.25)
+        self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_pairs(points, 0.25))
+        self.assertIn((801, 804), set(zip(i.tolist(), j.tolist())))
+
+    def test_counting_order(self):
+        rng = np.random.default_rng(6)
+        for size in (16, 1 << 20):
+            keys = rng.integers(0, size, 5000)
+            npt.assert_array_equal(counting_order(keys, size), np.argsort(keys, kind='stable'))
+
+    def test_buckets(self):
+        grid = SpatialHash(self.points, 0.25)
+        self.assertEqual(grid.count.sum(), self.points.shape[0])
+        keys = grid.hash(grid.cells)
+        npt.assert_array_equal(keys[grid.order], np.sort(keys))
+        bucket = keys[0]
+        run = grid.order[grid.start[bucket]:grid.start[bucket] + grid.count[bucket]]
+        npt.assert_array_equal(run, np.nonzero(keys == bucket)[0])
+
+    def test_density(self):
+        radius = 0.3
+        density = SpatialHash(self.points, radius).density(radius)
+        away = self.points[:, None, :] - self.points[None, :, :]
+        r2 = np.einsum('ijk,ijk->ij', away, away)
+        weight = np.where(r2 <= radius * radius, (radius * radius - r2) ** 3, 0.0)
+        npt.assert_allclose(density, 315 / (64 * np.pi * radius ** 9) * weight.sum(axis=1))
+
+    def test_separation(self):
+        points = np.array([[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [5.0, 0.0, 0.0]])
+        push = SpatialHash(points, 0.4).separation(0.4, 2.0)
+        npt.assert_allclose(push, [[-1.5, 0, 0], [1.5, 0, 0], [0, 0, 0]])
+
+    def test_collide(self):
+        rng = np.random.default_rng(3)
+        velocity = rng.uniform(-1.0, 1.0, self.points.shape)
+        grid = SpatialHash(self.points, 0.2)
+        for restitution in (0.0, 1.0):
+            delta = grid.collide(velocity, 0.2, restitution)
+            # Equal masses: every impulse has an equal and opposite one
+            npt.assert_allclose(delta.sum(axis=0), 0.0, atol=1e-9)
+        points = np.array([[0.0, 0.0, 0.0], [0.1, 0.0, 0.0]])
+        velocity = np.array([[1.0, 0.5, 0.0], [-1.0, 0.0, 0.0]])
+        after = velocity + SpatialHash(points, 0.2).collide(velocity, 0.2, 1.0)
+        npt.assert_allclose(after, [[-1.0, 0.5, 0.0], [1.0, 0.0, 0.0]])
+        # Moving apart already, nothing changes
+        npt.assert_allclose(SpatialHash(points, 0.2).collide(-velocity, 0.2, 1.0), 0.0)
+
+    def test_store(self):
+        store = ParticleStore(capacity=4)
+        store.add(np.array([[0.0, 0, 0], [9.0, 9, 9], [0.1, 0, 0]]),
+                  np.array([[1.0, 0, 0], [0.0, 0, 0], [-1.0, 0, 0]]), 1.0, ttl=10.0)
+        store.interact(0.2, restitution=1.0)
+        npt.assert_allclose(store.velocity, [[-1, 0, 0], [0, 0, 0], [1, 0, 0]])
+
+if __name__ == '__main__':
+    unittest.main()
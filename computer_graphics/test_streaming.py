@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+import numpy.testing as npt
+import moderngl as mgl
+from .streaming import StreamingBuffer
+
+class TestStreamingBuffer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.ctx = mgl.create_standalone_context(backend='egl')
+        except Exception as error:
+            raise unittest.SkipTest(f"No headless OpenGL context: {error}")
+        cls.program = cls.ctx.program(
+            vertex_shader='''
+                #version 330 core
+                in vec3 aPointPosition;
+                void main() { gl_Position = vec4(aPointPosition, 1.0); }
+            ''',
+            fragment_shader='''
+                #version 330 core
+                out vec4 color;
+                void main() { color = vec4(1.0); }
+            ''',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ctx.release()
+
+    def read(self, stream):
+        return np.frombuffer(stream.buffer.read(size=stream.rows * 12), dtype='f4').reshape((-1, 3))
+
+    def test_growth(self):
+        stream = StreamingBuffer(self.ctx, self.program, '3f', ['aPointPosition'], stride=12, capacity=4)
+        points = np.arange(30, dtype='f4').reshape((10, 3))
+        self.assertEqual(stream.write([points[7:], points[:7]]), 10)
+        self.assertGreaterEqual(stream.size, 120)
+        npt.assert_array_equal(self.read(stream), np.vstack([points[7:], points[:7]]))
+        size = stream.size
+        stream.write([points[:2]])
+        self.assertEqual(stream.size, size)
+        npt.assert_array_equal(self.read(stream), points[:2])
+        stream.render()
+
+    def test_round_robin(self):
+        stream = StreamingBuffer(self.ctx, self.program, '3f', ['aPointPosition'], stride=12,
+                                 copies=3)
+        used = []
+        for frame in range(4):
+            stream.write([np.full((frame + 1, 3), frame, dtype='f4')])
+            used.append(stream.current)
+            npt.assert_array_equal(self.read(stream), np.full((frame + 1, 3), frame))
+        self.assertEqual(used, [1, 2, 0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from .timestep import FixedTimestep
+
+class TestFixedTimestep(unittest.TestCase):
+    def test_frame_rates(self):
+        for frame_time in (1 / 30, 1 / 60, 1 / 144, 0.05):
+            timestep = FixedTimestep(1 / 60)
+            steps = sum(timestep.advance(frame_time) for _ in range(round(6 / frame_time)))
+            # Six seconds are 360 steps whatever the frame rate
+            self.assertAlmostEqual(steps, 360, delta=1)
+            self.assertLess(timestep.alpha, 1.0)
+
+    def test_backlog(self):
+        timestep = FixedTimestep(0.1, max_steps=4)
+        self.assertEqual(timestep.advance(2.0), 4)
+        self.assertEqual(timestep.accumulator, 0.0)
+        self.assertEqual(timestep.advance(0.25), 2)
+        self.assertAlmostEqual(timestep.alpha, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -125,16 +125,14 @@ class DumbModel(BaseModel):
         self.ctx = ctx
         self.prog = program
 
-        vertices = solid.get_cover_triangles()
+        buffers = solid.export_buffers(["position", "texindex"])
         f = lambda x: (0.1, 0.1, 0.1, 0.5) if x % 2 == 0 else (0.75, 0.09, 0.03, 0.5)
         # colors = np.array([f(i) for i in range(indexes.shape[0])])
-        tex_indexes = solid.get_cover_triangles_tex()
 
-        tex_coords = [(texmap[2 * i], texmap[2 * i + 1]) for i in tex_indexes]
-        tex = np.array(tex_coords, dtype="f4").flatten()
+        tex = np.asarray(texmap, dtype='f4').reshape((-1, 2))[buffers["texindex"]]
 
-        self.vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        self.tbo = self.ctx.buffer(tex.astype('f4').tobytes())
+        self.vbo = self.ctx.buffer(buffers["position"])
+        self.tbo = self.ctx.buffer(tex)
 
         self.vao = self.ctx.vertex_array(self.prog, [
                 (self.vbo, '3f', 'aVertexPosition'),
@@ -0,0 +1,26 @@
+class FixedTimestep:
+    # Turns frame times of any length into whole fixed steps, so a simulation runs
+    # at the same speed at every frame rate. Time left over carries to the next
+    # frame; past max_steps in one frame the backlog is dropped instead of
+    # growing without end when steps cost more than they cover.
+    def __init__(self, step: float, max_steps: int = 8) -> None:
+        if step <= 0:
+            raise RuntimeError("Timestep must be positive")
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, frame_time: float) -> int:
+        self.accumulator += max(frame_time, 0.0)
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    # How far the carried time is into the next step, to interpolate rendering
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.step
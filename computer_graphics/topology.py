@@ -0,0 +1,163 @@
+from typing import Tuple
+import numpy as np
+import igraph as ig
+from numpy.typing import NDArray
+
+
+def csr_ptr(counts: np.ndarray) -> NDArray[np.int32]:
+    ptr = np.zeros(counts.shape[0] + 1, dtype=np.int32)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr
+
+def csr_gather(ptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Positions of all entries of the given CSR rows, and the row each one came from
+    counts = ptr[rows + 1] - ptr[rows]
+    owners = np.repeat(np.arange(rows.shape[0]), counts)
+    starts = np.repeat(ptr[rows] - np.cumsum(counts) + counts, counts)
+    return starts + np.arange(owners.shape[0]), owners
+
+
+class Topology:
+    def __init__(self, vertex_num: int, edges: np.ndarray, face_ptr: np.ndarray,
+                 face_vertices: np.ndarray, ordered: bool = False) -> None:
+        self.vertex_num = vertex_num
+        self.face_num = face_ptr.shape[0] - 1
+        face_sizes = np.diff(face_ptr)
+        face_of = np.repeat(np.arange(self.face_num, dtype=np.int64), face_sizes)
+        member_keys = np.sort(face_of * vertex_num + face_vertices)
+
+        # vertex -> faces
+        order = np.argsort(face_vertices, kind='stable')
+        self.vertex_face_ptr = csr_ptr(np.bincount(face_vertices, minlength=vertex_num))
+        self.vertex_faces = face_of[order].astype(np.int32)
+
+        # edge -> faces: faces of the source vertex that also contain the target
+        pos, edge_of = csr_gather(self.vertex_face_ptr, edges[:, 0])
+        faces = self.vertex_faces[pos].astype(np.int64)
+        keys = faces * vertex_num + edges[edge_of, 1]
+        found = np.searchsorted(member_keys, keys)
+        found[found == member_keys.shape[0]] = 0
+        shared = member_keys[found] == keys
+        edge_of, faces = edge_of[shared], faces[shared]
+        self.edge_face_ptr = csr_ptr(np.bincount(edge_of, minlength=edges.shape[0]))
+        self.edge_faces = faces.astype(np.int32)
+
+        # face -> ordered vertex loop
+        self.loop_ptr = face_ptr.astype(np.int32)
+        if ordered:
+            self.loop_vertices = face_vertices.astype(np.int32)
+        else:
+            self.loop_vertices = self._order_loops(edges[edge_of], faces, face_ptr, face_vertices)
+
+        self.triangles, self.tex_triangles, self.triangle_faces = self._fan(self.loop_ptr,
+                                                                            self.loop_vertices)
+        self.face_component, self.face_parity = self._orient(edges)
+
+    def _order_loops(self, face_edges: np.ndarray, faces: np.ndarray, face_ptr: np.ndarray,
+                     face_vertices: np.ndarray) -> NDArray[np.int32]:
+        n = self.vertex_num
+        # Each face vertex must have exactly two neighbours inside its face
+        keys = np.concatenate([faces * n + face_edges[:, 0], faces * n + face_edges[:, 1]])
+        values = np.concatenate([face_edges[:, 1], face_edges[:, 0]])
+        order = np.argsort(keys, kind='stable')
+        keys, values = keys[order], values[order]
+        node_keys, counts = np.unique(keys, return_counts=True)
+        face_sizes = np.diff(face_ptr)
+        polygons = face_sizes >= 3
+        node_faces = node_keys // n
+        cycle_nodes = np.bincount(node_faces[counts == 2], minlength=self.face_num)
+        bad = np.flatnonzero(polygons & (cycle_nodes != face_sizes))
+        if bad.shape[0] > 0:
+            raise RuntimeError(f"faces {bad.tolist()} are not simple cycles")
+        starts = np.searchsorted(keys, node_keys)
+        neighbours = np.stack([values[starts], values[np.minimum(starts + 1, keys.shape[0] - 1)]],
+                              axis=1)
+
+        # Walk all faces at once: start at the lowest vertex, step to its larger neighbour
+        loops = face_vertices.astype(np.int64)
+        walk = np.flatnonzero(polygons)
+        if walk.shape[0] == 0:
+            return loops.astype(np.int32)
+        lowest = np.full(self.face_num, n, dtype=np.int64)
+        np.minimum.at(lowest, np.repeat(np.arange(self.face_num), face_sizes), face_vertices)
+        faces_walk, base, sizes = walk.astype(np.int64), face_ptr[walk].astype(np.int64), face_sizes[walk]
+        prev = cur = lowest[walk]
+        for step in range(int(sizes.max())):
+            active = step < sizes
+            faces_walk, base, sizes = faces_walk[active], base[active], sizes[active]
+            prev, cur = prev[active], cur[active]
+            loops[base + step] = cur
+            nb = neighbours[np.searchsorted(node_keys, faces_walk * n + cur)]
+            if step == 0:
+                prev, cur = cur, nb.max(axis=1)
+            else:
+                prev, cur = cur, np.where(nb[:, 0] != prev, nb[:, 0], nb[:, 1])
+        return loops.astype(np.int32)
+
+    def _orient(self, edges: np.ndarray) -> Tuple[NDArray[np.int32], NDArray[np.bool_]]:
+        # Faces sharing an edge are consistently wound when they traverse it in opposite
+        # directions. Parity says whether a face must be reversed to agree with the root
+        # face of its connected component.
+        n = self.vertex_num
+        sizes = np.diff(self.loop_ptr)
+        loop_faces = np.repeat(np.arange(self.face_num, dtype=np.int64), sizes)
+        following = np.arange(self.loop_vertices.shape[0]) + 1
+        following[self.loop_ptr[1:][sizes > 0] - 1] = self.loop_ptr[:-1][sizes > 0]
+        next_keys = loop_faces * n + self.loop_vertices
+        order = np.argsort(next_keys)
+        next_keys, next_vertices = next_keys[order], self.loop_vertices[following][order]
+
+        edge_of = np.repeat(np.arange(edges.shape[0]), np.diff(self.edge_face_ptr))
+        faces = self.edge_faces.astype(np.int64)
+        found = np.searchsorted(next_keys, faces * n + edges[edge_of, 0])
+        forward = next_vertices[found] == edges[edge_of, 1]
+
+        # Pair every face of an edge with the first face of that edge
+        first = self.edge_face_ptr[edge_of]
+        pairs = np.flatnonzero(np.arange(edge_of.shape[0]) != first)
+        fa, fb = faces[first[pairs]], faces[pairs]
+        flip = forward[first[pairs]] == forward[pairs]
+
+        # Spanning forest of the face adjacency graph: one BFS from an extra vertex
+        # linked to the lowest face of every connected component
+        adjacency = ig.Graph(n=self.face_num, edges=np.stack([fa, fb], axis=1).tolist())
+        component = np.array(adjacency.connected_components().membership, dtype=np.int32)
+        _, roots = np.unique(component, return_index=True)
+        adjacency.add_vertices(1)
+        adjacency.add_edges([(self.face_num, int(root)) for root in roots])
+        parent = np.array(adjacency.bfs(self.face_num)[2][:self.face_num], dtype=np.int64)
+        parent[roots] = roots
+
+        # Parity of every face relative to its parent, then to its root by pointer jumping
+        keys = np.concatenate([fa * self.face_num + fb, fb * self.face_num + fa])
+        order = np.argsort(keys)
+        keys, flip = keys[order], np.concatenate([flip, flip])[order]
+        parity = np.zeros(self.face_num, dtype=np.bool_)
+        if keys.shape[0] > 0:
+            found = np.searchsorted(keys, np.arange(self.face_num) * self.face_num + parent)
+            parity = flip[np.minimum(found, keys.shape[0] - 1)]
+            parity[roots] = False
+        while np.any(parent[parent] != parent):
+            parity = parity ^ parity[parent]
+            parent = parent[parent]
+        return component, parity
+
+    @classmethod
+    def _fan(cls, loop_ptr: np.ndarray,
+             loop_vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tri_counts = np.maximum(np.diff(loop_ptr) - 2, 0)
+        tri_faces = np.repeat(np.arange(tri_counts.shape[0], dtype=np.int32), tri_counts)
+        local = np.arange(tri_faces.shape[0], dtype=np.int32) - np.repeat(csr_ptr(tri_counts)[:-1],
+                                                                         tri_counts)
+        tex = np.stack([np.zeros_like(local), local + 1, local + 2], axis=1)
+        triangles = loop_vertices[loop_ptr[tri_faces][:, None] + tex]
+        return triangles, tex, tri_faces
+
+    def loop(self, face_pos: int) -> NDArray[np.int32]:
+        return self.loop_vertices[self.loop_ptr[face_pos]:self.loop_ptr[face_pos + 1]]
+
+    def faces_of_vertex(self, v_idx: int) -> NDArray[np.int32]:
+        return self.vertex_faces[self.vertex_face_ptr[v_idx]:self.vertex_face_ptr[v_idx + 1]]
+
+    def faces_of_edge(self, e_idx: int) -> NDArray[np.int32]:
+        return self.edge_faces[self.edge_face_ptr[e_idx]:self.edge_face_ptr[e_idx + 1]]
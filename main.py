@@ -1,4 +1,6 @@
 import computer_graphics as cg
+from computer_graphics import mesh_cache
 
 if __name__ == "__main__":
-    cg.ParticleScene.run()
\ No newline at end of file
+    mesh_cache.enable()
+    cg.ParticleScene.run()